@@ -0,0 +1,80 @@
+"""
+Cost per event of each streaming detector.
+
+    python -m benchmarks.detectors --events 200000 --sensors 1000
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from processor.anomaly_detector import SystemEventTracker
+from processor.detectors import DETECTORS, DetectorBank, PARAMETERS
+
+
+def synthetic_events(count: int, sensors: int, seed: int = 7) -> List[Dict[str, Any]]:
+    # Readings jitter around a per-sensor baseline, so the detectors mostly
+    # take their quiet path as they would on a healthy plant
+    rng: random.Random = random.Random(seed)
+    start: float = 1_748_000_000.0
+    events: List[Dict[str, Any]] = []
+    for i in range(count):
+        ts: float = start + i * 2.0 / sensors
+        events.append(
+            {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(ts))
+                + f".{int(ts % 1 * 1e6):06d}Z",
+                "sensor_id": f"wtf-pipe-{i % sensors}",
+                "temperature": round(rng.gauss(25.0, 0.5), 1),
+                "pressure": round(rng.gauss(2.0, 0.1), 2),
+                "flow": round(rng.gauss(60.0, 2.0), 1),
+                "_ts": ts,
+            }
+        )
+    return events
+
+
+def time_tracker(
+    events: List[Dict[str, Any]], detectors: Optional[DetectorBank]
+) -> float:
+    tracker: SystemEventTracker = SystemEventTracker(detectors=detectors)
+    start: float = time.perf_counter()
+    for event in events:
+        tracker.process_event(event)
+    return (time.perf_counter() - start) / len(events)
+
+
+def time_bank(events: List[Dict[str, Any]], bank: DetectorBank) -> Tuple[float, int]:
+    fired: int = 0
+    start: float = time.perf_counter()
+    for event in events:
+        fired += len(bank.run(event["sensor_id"], event, event["_ts"]))
+    return (time.perf_counter() - start) / len(events), fired
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--sensors", type=int, default=1_000)
+    args = parser.parse_args()
+
+    events: List[Dict[str, Any]] = synthetic_events(args.events, args.sensors)
+    all_detectors: Dict[str, Any] = {"detectors": {name: {} for name in DETECTORS}}
+
+    print(f"{args.events} events, {args.sensors} sensors, {len(PARAMETERS)} parameters")
+    print(f"{'detector':<24}{'ns/event':>12}{'fired':>10}")
+    for name in DETECTORS:
+        cost, fired = time_bank(events, DetectorBank({"detectors": {name: {}}}))
+        print(f"{name:<24}{cost * 1e9:>12.0f}{fired:>10}")
+    cost, fired = time_bank(events, DetectorBank(all_detectors))
+    print(f"{'all (bank only)':<24}{cost * 1e9:>12.0f}{fired:>10}")
+    print(f"{'tracker (rules only)':<24}{time_tracker(events, None) * 1e9:>12.0f}")
+    print(
+        f"{'tracker + all':<24}"
+        f"{time_tracker(events, DetectorBank(all_detectors)) * 1e9:>12.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
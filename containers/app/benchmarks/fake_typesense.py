@@ -0,0 +1,217 @@
+"""
+In-memory stand-in for the parts of the Typesense client used by
+`SystemEventsDBHandler` and `AnomalySummary`, so the hot paths can be
+benchmarked without a server.
+
+Supported: collections.create, collections[name].retrieve/delete,
+documents.create/upsert/import_/search/export and documents[id].retrieve.
+Search understands `*` queries, `&&`-joined `field:value`,
+`field:>=N`-style filters and a single `field:asc|desc` sort.
+"""
+
+import itertools
+import json
+import operator
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from typesense.exceptions import ObjectAlreadyExists, ObjectNotFound
+
+_OPERATORS: Tuple[Tuple[str, Callable[[Any, Any], bool]], ...] = (
+    (">=", operator.ge),
+    ("<=", operator.le),
+    (">", operator.gt),
+    ("<", operator.lt),
+    ("=", operator.eq),
+)
+
+
+def _parse_value(raw: str) -> Any:
+    if raw in ("true", "false"):
+        return raw == "true"
+    try:
+        return int(raw)
+    except ValueError:
+        try:
+            return float(raw)
+        except ValueError:
+            return raw.strip("`")
+
+
+def _compile_filter(filter_by: str) -> Callable[[Dict[str, Any]], bool]:
+    clauses: List[Tuple[str, Callable[[Any, Any], bool], Any]] = []
+    for clause in filter(None, (c.strip() for c in filter_by.split("&&"))):
+        field, _, expr = clause.partition(":")
+        compare: Callable[[Any, Any], bool] = operator.eq
+        for symbol, fn in _OPERATORS:
+            if expr.startswith(symbol):
+                compare, expr = fn, expr[len(symbol) :]
+                break
+        clauses.append((field.strip(), compare, _parse_value(expr.strip())))
+
+    def matches(doc: Dict[str, Any]) -> bool:
+        for field, compare, value in clauses:
+            current: Any = doc.get(field)
+            if current is None or not compare(current, value):
+                return False
+        return True
+
+    return matches
+
+
+class FakeDocument:
+    def __init__(self, collection: "FakeCollection", doc_id: str) -> None:
+        self.collection: FakeCollection = collection
+        self.doc_id: str = doc_id
+
+    def retrieve(self) -> Dict[str, Any]:
+        try:
+            return dict(self.collection.docs[self.doc_id])
+        except KeyError:
+            raise ObjectNotFound(404, f"Could not find a document with id: {self.doc_id}")
+
+    def delete(self) -> Dict[str, Any]:
+        doc: Dict[str, Any] = self.retrieve()
+        del self.collection.docs[self.doc_id]
+        self.collection.version += 1
+        return doc
+
+
+class FakeDocuments:
+    def __init__(self, collection: "FakeCollection") -> None:
+        self.collection: FakeCollection = collection
+
+    def __getitem__(self, doc_id: str) -> FakeDocument:
+        return FakeDocument(self.collection, doc_id)
+
+    def _write(self, document: Dict[str, Any], action: str) -> Dict[str, Any]:
+        coll: FakeCollection = self.collection
+        doc: Dict[str, Any] = dict(document)
+        doc_id: str = str(doc.get("id") or next(coll.ids))
+        if action == "create" and doc_id in coll.docs:
+            raise ObjectAlreadyExists(409, "A document with id already exists.")
+        doc["id"] = doc_id
+        coll.docs[doc_id] = doc
+        coll.version += 1
+        return dict(doc)
+
+    def create(self, document: Dict[str, Any], params: Any = None) -> Dict[str, Any]:
+        return self._write(document, "create")
+
+    def upsert(self, document: Dict[str, Any], params: Any = None) -> Dict[str, Any]:
+        return self._write(document, "upsert")
+
+    def import_(
+        self,
+        documents: List[Dict[str, Any]],
+        import_parameters: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = import_parameters or {}
+        action: str = params.get("action", "create")
+        results: List[Dict[str, Any]] = []
+        for document in documents:
+            try:
+                doc: Dict[str, Any] = self._write(document, action)
+            except ObjectAlreadyExists as exc:
+                results.append({"success": False, "error": str(exc), "code": 409})
+                continue
+            result: Dict[str, Any] = {"success": True}
+            if params.get("return_id"):
+                result["id"] = doc["id"]
+            results.append(result)
+        return results
+
+    def export(self, params: Optional[Dict[str, Any]] = None) -> str:
+        docs = self.collection.docs.values()
+        if params and params.get("filter_by"):
+            matches = _compile_filter(params["filter_by"])
+            docs = [doc for doc in docs if matches(doc)]  # type: ignore
+        return "\n".join(json.dumps(doc) for doc in docs)
+
+    def search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        coll: FakeCollection = self.collection
+        key: Tuple[str, str] = (params.get("filter_by", ""), params.get("sort_by", ""))
+
+        # Pagination re-runs the same query; cache the ordered ids until a write
+        cached: Optional[Tuple[int, List[str]]] = coll.search_cache.get(key)
+        if cached is None or cached[0] != coll.version:
+            matches = _compile_filter(key[0])
+            ids: List[str] = [doc_id for doc_id, doc in coll.docs.items() if matches(doc)]
+            if key[1]:
+                field, _, direction = key[1].partition(":")
+                ids.sort(
+                    key=lambda doc_id: coll.docs[doc_id].get(field, 0),
+                    reverse=direction == "desc",
+                )
+            cached = (coll.version, ids)
+            coll.search_cache[key] = cached
+
+        ids = cached[1]
+        per_page: int = int(params.get("per_page", 10))
+        page: int = int(params.get("page", 1))
+        window: List[str] = ids[(page - 1) * per_page : page * per_page]
+        return {
+            "found": len(ids),
+            "page": page,
+            "hits": [{"document": dict(coll.docs[doc_id])} for doc_id in window],
+        }
+
+
+class FakeCollection:
+    def __init__(self, client: "FakeTypesense", name: str) -> None:
+        self.client: FakeTypesense = client
+        self.name: str = name
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.ids: itertools.count = itertools.count(1)
+        self.version: int = 0
+        self.search_cache: Dict[Tuple[str, str], Tuple[int, List[str]]] = {}
+        self.documents: FakeDocuments = FakeDocuments(self)
+
+    def retrieve(self) -> Dict[str, Any]:
+        schema: Optional[Dict[str, Any]] = self.client.schemas.get(self.name)
+        if schema is None:
+            raise ObjectNotFound(404, f"Not Found: {self.name}")
+        return {**schema, "num_documents": len(self.docs)}
+
+    def update(self, schema_change: Dict[str, Any]) -> Dict[str, Any]:
+        schema: Dict[str, Any] = self.retrieve()
+        fields: List[Dict[str, Any]] = list(schema["fields"])
+        for change in schema_change.get("fields", []):
+            if change.get("drop"):
+                fields = [f for f in fields if f["name"] != change["name"]]
+            else:
+                fields.append(change)
+        self.client.schemas[self.name] = {**self.client.schemas[self.name], "fields": fields}
+        return schema_change
+
+    def delete(self) -> Dict[str, Any]:
+        schema: Dict[str, Any] = self.retrieve()
+        del self.client.schemas[self.name]
+        self.client.store.pop(self.name, None)
+        return schema
+
+
+class FakeCollections:
+    def __init__(self, client: "FakeTypesense") -> None:
+        self.client: FakeTypesense = client
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self.client.store:
+            self.client.store[name] = FakeCollection(self.client, name)
+        return self.client.store[name]
+
+    def create(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        self.client.schemas[schema["name"]] = schema
+        return self[schema["name"]].retrieve()
+
+
+class FakeTypesense:
+    """
+    Drop-in for `typesense.Client` in benchmarks: assign an instance to a
+    handler's `ts_client`/`ts_read_client` (or `ts`/`ts_read`).
+    """
+
+    def __init__(self) -> None:
+        self.schemas: Dict[str, Dict[str, Any]] = {}
+        self.store: Dict[str, FakeCollection] = {}
+        self.collections: FakeCollections = FakeCollections(self)
@@ -0,0 +1,28 @@
+import json
+import time
+from typing import Any, Dict
+
+
+class StubLLM:
+    """
+    Replacement for `generate_anomaly_summary` with a fixed latency.
+
+    The payload is still serialised, as the real prompt does, so its cost
+    scales with the batch size.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0) -> None:
+        self.latency_seconds: float = latency_seconds
+        self.calls: int = 0
+        self.prompt_bytes: int = 0
+
+    def __call__(self, anomaly_data: Dict[str, Any]) -> str:
+        self.calls += 1
+        self.prompt_bytes += len(json.dumps(anomaly_data, indent=2))
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        sensors: int = len(anomaly_data) - 2
+        return (
+            f"Between {anomaly_data.get('timestamp')} and {anomaly_data.get('stop_timestamp')} "
+            f"today, we observed anomalies on {sensors} sensors. No other issues were detected."
+        )
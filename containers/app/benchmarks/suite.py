@@ -0,0 +1,280 @@
+"""
+Offline benchmarks for the ingest and summary hot paths.
+
+Runs against an in-memory Typesense fake and a stub LLM, so no Docker,
+Ollama or Typesense server is needed:
+
+    python -m benchmarks.suite --sizes 1000,10000,100000 --output bench.json
+    python -m benchmarks.suite --compare bench.json --tolerance 0.15
+
+Results are written as JSON; `--compare` exits non-zero when any benchmark
+got slower than the tolerance relative to a previous results file.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+# processor.database builds its clients at import time; give it a config
+# that never gets used, since every handler is pointed at the fake below.
+os.environ.setdefault("TYPESENSE_API", "offline-benchmark")
+os.environ.setdefault("TYPESENSE_HOST", "localhost")
+os.environ.setdefault("TYPESENSE_PORT", "8108")
+
+from benchmarks.fake_typesense import FakeTypesense  # noqa: E402
+from benchmarks.stub_llm import StubLLM  # noqa: E402
+from processor import runner  # noqa: E402
+from processor.anomaly_detector import SystemEventTracker  # noqa: E402
+from processor.database import (  # noqa: E402
+    AnomalySummary,
+    SystemEventsDBHandler,
+    int_from_iso,
+)
+
+
+def synthetic_events(
+    count: int, sensors: int = 50, seed: int = 7
+) -> List[Dict[str, Any]]:
+    """
+    Readings with roughly the simulator's mix of spikes and drifts,
+    oldest first and ending now.
+    """
+    rng: random.Random = random.Random(seed)
+    now: datetime = datetime.now(timezone.utc)
+    step: timedelta = timedelta(seconds=2.0 / sensors)
+    start: datetime = now - step * count
+    events: List[Dict[str, Any]] = []
+    for i in range(count):
+        ts: datetime = start + step * i
+        roll: float = rng.random()
+        events.append(
+            {
+                "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+                "sensor_id": f"wtf-pipe-{rng.randrange(sensors) + 1}",
+                "temperature": round(
+                    rng.uniform(38.1, 40.0) if roll < 0.09 else rng.uniform(10.0, 35.0), 1
+                ),
+                "pressure": round(
+                    rng.uniform(4.1, 5.0) if 0.09 <= roll < 0.15 else rng.uniform(1.0, 3.0), 1
+                ),
+                "flow": round(
+                    rng.uniform(121.0, 140.0) if 0.15 <= roll < 0.21 else rng.uniform(20.0, 100.0), 1
+                ),
+            }
+        )
+    return events
+
+
+def detect(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    tracker: SystemEventTracker = SystemEventTracker()
+    return [{**event, **tracker.process_event(event)} for event in events]
+
+
+def load_store(docs: List[Dict[str, Any]]) -> FakeTypesense:
+    """
+    Fresh fake holding `docs` as unprocessed system_events documents.
+    """
+    fake: FakeTypesense = FakeTypesense()
+    events = SystemEventsDBHandler()
+    events.ts_client = events.ts_read_client = fake  # type: ignore
+    summaries = AnomalySummary()
+    summaries.ts = summaries.ts_read = fake  # type: ignore
+    events.create_collection()
+    summaries.create_collection()
+
+    collection = fake.collections[events.collection_name]
+    for i, doc in enumerate(docs, 1):
+        stored: Dict[str, Any] = {
+            **doc,
+            "id": str(i),
+            "timestamp": int_from_iso(doc["timestamp"]),
+            "processed": False,
+        }
+        collection.docs[stored["id"]] = stored
+    collection.version += 1
+    return fake
+
+
+def use_store(fake: FakeTypesense) -> SystemEventsDBHandler:
+    runner.system_event_store.ts_client = fake  # type: ignore
+    runner.system_event_store.ts_read_client = fake  # type: ignore
+    runner.anomaly_summary_store.ts = fake  # type: ignore
+    runner.anomaly_summary_store.ts_read = fake  # type: ignore
+    return runner.system_event_store
+
+
+def timed(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> float:
+    """
+    Best wall time of `repeat` runs; `setup` runs untimed before each.
+    """
+    best: float = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start: float = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def result(name: str, size: int, items: int, seconds: float, **extra: Any) -> Dict[str, Any]:
+    return {
+        "benchmark": name,
+        "size": size,
+        "items": items,
+        "seconds": round(seconds, 6),
+        "ns_per_item": round(seconds / items * 1e9, 1) if items else None,
+        "items_per_second": round(items / seconds, 1) if seconds else None,
+        **extra,
+    }
+
+
+def run_size(size: int, repeat: int, llm_latency: float) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    events: List[Dict[str, Any]] = synthetic_events(size)
+
+    # SystemEventTracker.process_event
+    def process() -> None:
+        tracker: SystemEventTracker = SystemEventTracker()
+        for event in events:
+            tracker.process_event(event)
+
+    seconds: float = timed(process, repeat)
+    results.append(result("process_event", size, size, seconds))
+
+    docs: List[Dict[str, Any]] = detect(events)
+    anomalous: List[Dict[str, Any]] = [doc for doc in docs if doc["is_anomaly"]]
+
+    # group_anomalies over the unprocessed anomaly documents
+    seconds = timed(lambda: runner.group_anomalies(anomalous), repeat)
+    results.append(result("group_anomalies", size, len(anomalous), seconds))
+
+    # _search_anomalies pagination (250 per page)
+    store: SystemEventsDBHandler = use_store(load_store(docs))
+    found: List[Dict[str, Any]] = []
+
+    def search() -> None:
+        found[:] = store.recent_unprocessed_anomalies()
+
+    seconds = timed(search, repeat)
+    results.append(
+        result("search_anomalies", size, len(found), seconds, pages=-(-len(found) // 250))
+    )
+
+    # set_process upserts every summarised document
+    batch: List[Dict[str, Any]] = []
+
+    def fresh_batch() -> None:
+        batch[:] = [dict(doc) for doc in found]
+
+    seconds = timed(lambda: store.set_process(batch), repeat, setup=fresh_batch)
+    results.append(result("set_process", size, len(found), seconds))
+
+    # Full summarize() cycle: search, group, LLM, add_summary, set_process
+    llm: StubLLM = StubLLM(llm_latency)
+    runner.generate_anomaly_summary = llm  # type: ignore
+
+    seconds = timed(
+        lambda: asyncio.run(runner.summarize()),
+        repeat,
+        setup=lambda: use_store(load_store(docs)),
+    )
+    results.append(
+        result(
+            "summarize",
+            size,
+            len(anomalous),
+            seconds,
+            llm_latency_seconds=llm_latency,
+            overhead_seconds=round(seconds - llm_latency, 6),
+        )
+    )
+    return results
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> bool:
+    """
+    Print the change against a previous run; return False on a regression.
+    """
+    with open(baseline_path) as fh:
+        baseline: Dict[Any, Dict[str, Any]] = {
+            (r["benchmark"], r["size"]): r for r in json.load(fh)["results"]
+        }
+
+    ok: bool = True
+    print(f"\n{'benchmark':<20}{'size':>10}{'baseline s':>14}{'current s':>14}{'change':>10}")
+    for r in current:
+        base: Optional[Dict[str, Any]] = baseline.get((r["benchmark"], r["size"]))
+        if not base or not base["seconds"]:
+            continue
+        change: float = r["seconds"] / base["seconds"] - 1.0
+        flag: str = ""
+        if change > tolerance:
+            flag, ok = "  REGRESSION", False
+        print(
+            f"{r['benchmark']:<20}{r['size']:>10}{base['seconds']:>14.4f}"
+            f"{r['seconds']:>14.4f}{change:>+10.1%}{flag}"
+        )
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated event counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark (best is kept)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Stub LLM latency in seconds")
+    parser.add_argument("--output", default=None, help="Write JSON results to this file")
+    parser.add_argument("--compare", default=None, help="Previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown for --compare")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        for r in run_size(size, args.repeat, args.llm_latency):
+            print(
+                f"{r['benchmark']:<20}{r['size']:>10}{r['items']:>10} items"
+                f"{r['seconds']:>12.4f}s{r['ns_per_item'] or 0:>12.0f} ns/item"
+            )
+            results.append(r)
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "llm_latency_seconds": args.llm_latency,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,12 @@ import logging
 from urllib.parse import urlparse
 
 from itsup import wait_for_model, wait_for_port, wait_for_route
-from processor.database import AnomalySummary, SystemEventsDBHandler
+from processor.database import (
+    AnomalySummary,
+    SystemEventsDBHandler,
+    node_url,
+    typesense_nodes,
+)
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -26,8 +31,9 @@ def main():
     ollama_url = urlparse(get_env_var("OLLAMA_API"))
     ollama_model = get_env_var("OLLAMA_MODEL")
 
-    typesense_host = get_env_var("TYPESENSE_HOST")
-    typesense_port = int(get_env_var("TYPESENSE_PORT"))
+    if not os.getenv("TYPESENSE_NODES"):
+        get_env_var("TYPESENSE_HOST")
+        get_env_var("TYPESENSE_PORT")
 
     ollama_host = ollama_url.hostname
     ollama_port = ollama_url.port
@@ -36,10 +42,11 @@ def main():
         logging.error("OLLAMA_API must include a valid hostname and port")
         sys.exit(1)
 
-    # Wait for Typesense to be ready
-    typesense_health_url = f"http://{typesense_host}:{typesense_port}/health"
-    logging.info(f"Waiting for Typesense at {typesense_health_url}")
-    wait_for_route(typesense_health_url, timeout=5)
+    # Wait for every Typesense node to be ready
+    for node in typesense_nodes():
+        typesense_health_url = f"{node_url(node)}/health"
+        logging.info(f"Waiting for Typesense at {typesense_health_url}")
+        wait_for_route(typesense_health_url, timeout=5)
     time.sleep(2)
 
     # Create database collections
@@ -2,11 +2,24 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
 
+from processor.detectors import DetectorBank
+from processor.dropout_monitor import DropoutMonitor
+from processor.rules import RuleEngine, RulePlan
+
 
 class SystemEventTracker:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        dropout_monitor: Optional[DropoutMonitor] = None,
+        detectors: Optional[DetectorBank] = None,
+        rules: Optional[RuleEngine] = None,
+    ) -> None:
         self.last_event_times: Dict[str, Optional[datetime]] = {}
-        self.drift_start_times: Dict[str, Optional[datetime]] = {}
+        # sensor_id -> rule name -> time the rule's condition started holding
+        self.duration_starts: Dict[str, Dict[str, datetime]] = {}
+        self.dropout_monitor: Optional[DropoutMonitor] = dropout_monitor
+        self.detectors: Optional[DetectorBank] = detectors
+        self.rules: RuleEngine = rules or RuleEngine()
 
     def process_event(
         self, event: Dict[str, Any]
@@ -22,73 +35,99 @@ class SystemEventTracker:
             logging.error(f"Invalid timestamp {event.get('timestamp')}: {exc}")
             return {"anomalies": [], "is_anomaly": False}
 
-        # Dropout detection
+        plan: RulePlan = self.rules.plan(sensor_id)
+
+        # Dropout detection. When the monitor already stored a dropout for
+        # this gap, it only knew the threshold had passed; the full gap is
+        # recorded here, marked as the end of that dropout.
+        already_reported: bool = (
+            self.dropout_monitor.touch(sensor_id, plan.dropout_threshold)
+            if self.dropout_monitor
+            else False
+        )
         last_time: Optional[datetime] = self.last_event_times.get(sensor_id)
         if last_time:
             delta: float = (curr_time - last_time).total_seconds()
-            if delta > 10:
+            if delta > plan.dropout_threshold:
+                dropout: Dict[str, Any] = {
+                    "type": "dropout",
+                    "timestamp": event["timestamp"],
+                    "sensor_id": sensor_id,
+                    "parameter": None,
+                    "value": None,
+                    "duration_seconds": int(delta),
+                    "message": plan.dropout_message.format(
+                        delta=delta,
+                        threshold=plan.dropout_threshold,
+                        sensor_id=sensor_id,
+                    ),
+                }
+                if already_reported:
+                    dropout["resumed"] = True
+                anomalies.append(dropout)
+
+        # Update last event time
+        self.last_event_times[sensor_id] = curr_time
+
+        # Threshold rules; rules with a duration must hold for that long
+        starts: Optional[Dict[str, datetime]] = self.duration_starts.get(sensor_id)
+        for rule in plan.rules:
+            value: Optional[float] = event.get(rule.parameter)
+            if value is None or not rule.compare(value, rule.threshold):
+                if rule.duration and starts:
+                    starts.pop(rule.name, None)
+                continue
+
+            if not rule.duration:
                 anomalies.append(
                     {
-                        "type": "dropout",
+                        "type": rule.type,
                         "timestamp": event["timestamp"],
                         "sensor_id": sensor_id,
-                        "parameter": None,
-                        "value": None,
-                        "duration_seconds": int(delta),
-                        "message": f"No data for {delta:.1f}s (threshold 10s) on {sensor_id}",
+                        "parameter": rule.parameter,
+                        "value": value,
+                        "message": rule.message.format(
+                            value=value,
+                            threshold=rule.threshold,
+                            parameter=rule.parameter,
+                            sensor_id=sensor_id,
+                        ),
                     }
                 )
+                continue
 
-        # Update last event time
-        self.last_event_times[sensor_id] = curr_time
+            if starts is None:
+                starts = self.duration_starts[sensor_id] = {}
+            started: Optional[datetime] = starts.get(rule.name)
+            if started is None:
+                starts[rule.name] = curr_time
+                continue
 
-        # Spike detection
-        pressure: float = event.get("pressure", 0.0)  # type: ignore
-        flow: float = event.get("flow", 0.0)  # type: ignore
-        if pressure > 4.0:
-            anomalies.append(
-                {
-                    "type": "spike",
-                    "timestamp": event["timestamp"],
-                    "sensor_id": sensor_id,
-                    "parameter": "pressure",
-                    "value": pressure,
-                    "message": f"Pressure spike: {pressure:.2f} bar (threshold 4.0 bar)",
-                }
-            )
-        if flow > 120.0:
-            anomalies.append(
-                {
-                    "type": "spike",
-                    "timestamp": event["timestamp"],
-                    "sensor_id": sensor_id,
-                    "parameter": "flow",
-                    "value": flow,
-                    "message": f"Flow spike: {flow:.1f} L/min (threshold 120 L/min)",
-                }
-            )
+            duration: float = (curr_time - started).total_seconds()
+            if duration > rule.duration:
+                anomalies.append(
+                    {
+                        "type": rule.type,
+                        "timestamp": event["timestamp"],
+                        "sensor_id": sensor_id,
+                        "parameter": rule.parameter,
+                        "value": value,
+                        "duration_seconds": int(duration),
+                        "message": rule.message.format(
+                            value=value,
+                            threshold=rule.threshold,
+                            duration=rule.duration,
+                            duration_seconds=int(duration),
+                            parameter=rule.parameter,
+                            sensor_id=sensor_id,
+                        ),
+                    }
+                )
 
-        # Drift detection
-        temp: float = event.get("temperature", 0.0)  # type: ignore
-        drift_start: Optional[datetime] = self.drift_start_times.get(sensor_id)
-        if temp > 38.0:
-            if drift_start is None:
-                self.drift_start_times[sensor_id] = curr_time
-            else:
-                duration: float = (curr_time - drift_start).total_seconds()
-                if duration > 15:
-                    anomalies.append(
-                        {
-                            "type": "drift",
-                            "timestamp": event["timestamp"],
-                            "sensor_id": sensor_id,
-                            "parameter": "temperature",
-                            "value": temp,
-                            "duration_seconds": int(duration),
-                            "message": f"Temperature drift: {temp:.1f} °C for {int(duration)}s (threshold 15s)",
-                        }
-                    )
-        else:
-            self.drift_start_times[sensor_id] = None
+        # Streaming statistical detectors
+        if self.detectors is not None:
+            anomalies.extend(
+                self.detectors.run(sensor_id, event, curr_time.timestamp())
+            )
 
         return {"anomalies": anomalies, "is_anomaly": bool(anomalies)}
@@ -0,0 +1,339 @@
+"""
+Re-run anomaly detection over historical events and bulk-load the results.
+
+    python -m processor.backfill --source events.ndjson --target system_events_backfill
+    python -m processor.backfill --from-collection system_events \\
+        --since 2025-05-01T00:00:00Z --until 2025-06-01T00:00:00Z \\
+        --target system_events_backfill --workers 8
+
+Events are split by sensor into partition files, so each sensor's readings
+are replayed in timestamp order by exactly one worker. Finished partitions
+are recorded in a checkpoint; re-running with the same arguments resumes.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+import zlib
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from processor.database import int_from_iso, iso_from_int
+
+logger = logging.getLogger("backfill.py")
+
+EVENT_FIELDS: Tuple[str, ...] = ("timestamp", "sensor_id", "temperature", "pressure", "flow")
+READING_FIELDS: Tuple[str, ...] = ("temperature", "pressure", "flow")
+CHECKPOINT_FILE: str = "checkpoint.json"
+# The collection the web app ingests into and the manager summarises
+LIVE_COLLECTION: str = "system_events"
+
+
+def read_ndjson(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path) as fh:
+        for number, line in enumerate(fh, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping invalid JSON on line {number} of {path}")
+
+
+def read_collection(
+    collection: str, since: Optional[str], until: Optional[str], step_hours: int = 24
+) -> Iterator[Dict[str, Any]]:
+    """
+    Export events from Typesense one time window at a time, so memory stays
+    bounded by a single window. Without `since`/`until` the whole stored
+    range is covered.
+    """
+    from processor.database import SystemEventsDBHandler
+
+    store: SystemEventsDBHandler = SystemEventsDBHandler(collection)
+    if not since and not until:
+        bounds: Optional[Tuple[int, int]] = store.timestamp_range()
+        if bounds is None:
+            return
+        start, end = bounds[0], bounds[1] + 1
+    elif since and until:
+        start, end = int_from_iso(since), int_from_iso(until)
+    else:
+        raise ValueError("since and until must be given together")
+
+    step: int = step_hours * 3600 * 1000
+    while start < end:
+        stop: int = min(start + step, end)
+        yield from store.export_events(f"timestamp:>={start} && timestamp:<{stop}")
+        start = stop
+
+
+def normalise(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Keep the raw reading fields, with the timestamp as epoch ms.
+
+    Records with no reading at all (the dropout documents the live monitor
+    writes) are dropped: replaying them would reset the sensor's last-seen
+    time and split real gaps.
+    """
+    event: Dict[str, Any] = {k: record.get(k) for k in EVENT_FIELDS}
+    if not event["sensor_id"] or event["timestamp"] is None:
+        return None
+    if all(event[k] is None for k in READING_FIELDS):
+        return None
+    if isinstance(event["timestamp"], str):
+        try:
+            event["timestamp"] = int_from_iso(event["timestamp"])
+        except ValueError:
+            return None
+    return event
+
+
+def partition_of(sensor_id: str, partitions: int) -> int:
+    return zlib.crc32(sensor_id.encode()) % partitions
+
+
+def write_partitions(
+    records: Iterator[Dict[str, Any]], work_dir: str, partitions: int
+) -> int:
+    files: List[IO[str]] = [
+        open(os.path.join(work_dir, f"part-{i:04d}.ndjson"), "w") for i in range(partitions)
+    ]
+    written: int = 0
+    try:
+        for record in records:
+            event: Optional[Dict[str, Any]] = normalise(record)
+            if event is None:
+                continue
+            files[partition_of(event["sensor_id"], partitions)].write(json.dumps(event) + "\n")
+            written += 1
+            if written % 1_000_000 == 0:
+                logger.info(f"Partitioned {written} events")
+    finally:
+        for fh in files:
+            fh.close()
+    return written
+
+
+def process_partition(task: Tuple[int, str, str, int, bool]) -> Tuple[int, int, int]:
+    """
+    Replay one partition through a fresh SystemEventTracker and import the
+    results. Runs in a worker process.
+
+    Returns:
+        (partition, events, anomalous events)
+    """
+    from processor.anomaly_detector import SystemEventTracker
+    from processor.database import SystemEventsDBHandler, event_doc_id
+    from processor.detectors import load_detectors
+    from processor.rules import DEFAULT_RULES_PATH, RuleEngine
+
+    partition, path, target, batch_size, dry_run = task
+    events: List[Dict[str, Any]] = list(read_ndjson(path))
+    # Detection state is per sensor, so only each sensor's order matters
+    events.sort(key=lambda e: (e["sensor_id"], e["timestamp"]))
+
+    tracker: SystemEventTracker = SystemEventTracker(
+        detectors=load_detectors(),
+        rules=RuleEngine(os.getenv("RULES_CONFIG") or DEFAULT_RULES_PATH, reload_interval=0),
+    )
+    store: SystemEventsDBHandler = SystemEventsDBHandler(target)
+
+    anomalous: int = 0
+    batch: List[Dict[str, Any]] = []
+    for event in events:
+        ts_ms: int = event["timestamp"]
+        event["timestamp"] = iso_from_int(ts_ms)
+        processed: Dict[str, Any] = tracker.process_event(event)
+        anomalous += bool(processed["is_anomaly"])
+        batch.append(
+            {
+                **event,
+                **processed,
+                "id": event_doc_id(event["sensor_id"], ts_ms),
+                "timestamp": ts_ms,
+                "processed": False,
+            }
+        )
+        if len(batch) >= batch_size:
+            _flush(store, batch, dry_run)
+            batch = []
+    _flush(store, batch, dry_run)
+
+    return partition, len(events), anomalous
+
+
+def _flush(store: Any, batch: List[Dict[str, Any]], dry_run: bool) -> None:
+    if dry_run or not batch:
+        return
+    failed: List[Dict[str, Any]] = [
+        r for r in store.import_documents(batch, action="upsert") if not r.get("success")
+    ]
+    if failed:
+        raise RuntimeError(f"{len(failed)} documents failed to import: {failed[0]}")
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    tmp: str = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(checkpoint, fh, indent=2)
+    os.replace(tmp, path)
+
+
+def config_digest(path: Optional[str]) -> Optional[str]:
+    """
+    Hash of a detection config file, so a changed threshold starts a new run.
+    """
+    if not path:
+        return None
+    with open(path, "rb") as fh:
+        return hashlib.sha256(fh.read()).hexdigest()
+
+
+def source_fingerprint(args: argparse.Namespace) -> Dict[str, Any]:
+    from processor.rules import DEFAULT_RULES_PATH
+
+    fingerprint: Dict[str, Any] = {
+        "source": args.source,
+        "collection": args.from_collection,
+        "since": args.since,
+        "until": args.until,
+        "target": args.target,
+        "partitions": args.partitions,
+        "dry_run": args.dry_run,
+        "rules": config_digest(os.getenv("RULES_CONFIG") or DEFAULT_RULES_PATH),
+        "detectors": config_digest(os.getenv("DETECTORS_CONFIG")),
+    }
+    if args.source:
+        stat = os.stat(args.source)
+        fingerprint.update(size=stat.st_size, mtime=stat.st_mtime)
+    return fingerprint
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    os.makedirs(args.work_dir, exist_ok=True)
+    checkpoint_path: str = os.path.join(args.work_dir, CHECKPOINT_FILE)
+    fingerprint: Dict[str, Any] = source_fingerprint(args)
+
+    checkpoint: Dict[str, Any] = load_checkpoint(checkpoint_path)
+    if checkpoint.get("fingerprint") != fingerprint:
+        if checkpoint:
+            logger.info("Source or options changed; starting a fresh backfill")
+        checkpoint = {"fingerprint": fingerprint, "partitioned": False, "done": {}}
+
+    if not checkpoint["partitioned"]:
+        records: Iterator[Dict[str, Any]] = (
+            read_ndjson(args.source)
+            if args.source
+            else read_collection(args.from_collection, args.since, args.until)
+        )
+        started: float = time.perf_counter()
+        checkpoint["events"] = write_partitions(records, args.work_dir, args.partitions)
+        checkpoint["partitioned"] = True
+        save_checkpoint(checkpoint_path, checkpoint)
+        logger.info(
+            f"Partitioned {checkpoint['events']} events into {args.partitions} "
+            f"partitions in {time.perf_counter() - started:.1f}s"
+        )
+
+    if not args.dry_run:
+        from processor.database import SystemEventsDBHandler
+
+        SystemEventsDBHandler(args.target).create_collection()
+
+    done: Dict[str, List[int]] = checkpoint["done"]
+    pending: List[Tuple[int, str, str, int, bool]] = [
+        (i, os.path.join(args.work_dir, f"part-{i:04d}.ndjson"), args.target, args.batch_size, args.dry_run)
+        for i in range(args.partitions)
+        if str(i) not in done
+    ]
+    total_events: int = checkpoint["events"]
+    finished_events: int = sum(events for events, _ in done.values())
+    if done:
+        logger.info(f"Resuming: {len(done)}/{args.partitions} partitions already done")
+
+    started = time.perf_counter()
+    run_events: int = 0
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(args.workers) as pool:
+        for partition, events, anomalous in pool.imap_unordered(process_partition, pending):
+            done[str(partition)] = [events, anomalous]
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            run_events += events
+            finished_events += events
+            elapsed: float = time.perf_counter() - started
+            rate: float = run_events / elapsed if elapsed else 0.0
+            remaining: int = total_events - finished_events
+            eta: str = f"{remaining / rate:.0f}s" if rate else "?"
+            logger.info(
+                f"[{len(done)}/{args.partitions}] partition {partition}: {events} events, "
+                f"{anomalous} anomalous | {finished_events}/{total_events} events, "
+                f"{rate:.0f} events/s, ETA {eta}"
+            )
+
+    summary: Dict[str, Any] = {
+        "events": finished_events,
+        "anomalous_events": sum(a for _, a in done.values()),
+        "partitions": len(done),
+        "target": args.target,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+    logger.info(f"Backfill complete: {summary}")
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--source", help="NDJSON file of events, one JSON object per line")
+    source.add_argument("--from-collection", help="Typesense collection to export events from")
+    parser.add_argument("--since", help="With --from-collection: ISO start (inclusive)")
+    parser.add_argument("--until", help="With --from-collection: ISO end (exclusive)")
+    parser.add_argument("--target", required=True, help="Collection to import results into")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--partitions", type=int, default=None, help="Sensor partitions (default 8 x workers)")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Documents per import call")
+    parser.add_argument("--work-dir", default=".backfill", help="Partition files and checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="Run detection without importing")
+    parser.add_argument(
+        "--allow-live-target",
+        action="store_true",
+        help=f"Allow --target {LIVE_COLLECTION}; every imported event is re-summarised",
+    )
+    args = parser.parse_args(argv)
+
+    if args.from_collection and args.from_collection == args.target:
+        parser.error("--target must differ from --from-collection")
+    if args.target == LIVE_COLLECTION and not args.allow_live_target:
+        parser.error(
+            f"--target {LIVE_COLLECTION} overwrites live events as unprocessed, so the "
+            "manager summarises all of them again; pass --allow-live-target to do it anyway"
+        )
+    if bool(args.since) != bool(args.until):
+        parser.error("--since and --until must be given together")
+    if args.partitions is None:
+        args.partitions = args.workers * 8
+
+    run(args)
+
+
+if __name__ == "__main__":
+    from logs import setup_logging
+
+    setup_logging()
+    main()
@@ -1,26 +1,114 @@
+import hashlib
+import json
 import logging
 import os
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
 
+import requests
 import typesense
-from typesense.exceptions import ObjectNotFound
+from typesense.exceptions import ObjectAlreadyExists, ObjectNotFound
 
 logger = logging.getLogger("database.py")
 
-ts_client: typesense.Client = typesense.Client(
-    {
-        "nodes": [
+TYPESENSE_CONNECTION_TIMEOUT: float = float(
+    os.getenv("TYPESENSE_CONNECTION_TIMEOUT", "2")
+)
+TYPESENSE_NUM_RETRIES: int = int(os.getenv("TYPESENSE_NUM_RETRIES", "3"))
+TYPESENSE_RETRY_INTERVAL: float = float(os.getenv("TYPESENSE_RETRY_INTERVAL", "0.1"))
+TYPESENSE_HEALTHCHECK_INTERVAL: int = int(
+    os.getenv("TYPESENSE_HEALTHCHECK_INTERVAL", "15")
+)
+
+
+# Ports used when a node URL has none: Typesense's own default over plain
+# HTTP, the standard port over HTTPS (e.g. Typesense Cloud)
+DEFAULT_PORTS: Dict[str, int] = {"http": 8108, "https": 443}
+
+
+def typesense_nodes() -> List[Dict[str, Any]]:
+    """
+    Return the configured Typesense nodes.
+
+    `TYPESENSE_NODES` holds a comma-separated list of node URLs
+    (e.g. "http://ts-1:8108,https://ts.example.com"); a URL without a port
+    uses DEFAULT_PORTS for its scheme. When it is unset, the single
+    node described by TYPESENSE_HOST/TYPESENSE_PORT/TYPESENSE_PROTOCOL is used.
+    """
+    urls: List[str] = [
+        url.strip()
+        for url in os.getenv("TYPESENSE_NODES", "").split(",")
+        if url.strip()
+    ]
+    if not urls:
+        return [
             {
                 "host": os.getenv("TYPESENSE_HOST"),  # type: ignore
                 "port": os.getenv("TYPESENSE_PORT"),  # type: ignore
-                "protocol": os.getenv("TYPESENSE_PROTOCOL"),  # type: ignore
+                "protocol": os.getenv("TYPESENSE_PROTOCOL", "http"),
+            }
+        ]
+
+    nodes: List[Dict[str, Any]] = []
+    for url in urls:
+        parsed = urlparse(url if "://" in url else f"http://{url}")
+        if parsed.scheme not in DEFAULT_PORTS or not parsed.hostname:
+            raise ValueError(f"Invalid Typesense node URL in TYPESENSE_NODES: {url!r}")
+        nodes.append(
+            {
+                "host": parsed.hostname,
+                "port": parsed.port or DEFAULT_PORTS[parsed.scheme],
+                "protocol": parsed.scheme,
             }
-        ],
+        )
+    return nodes
+
+
+def node_url(node: Dict[str, Any]) -> str:
+    return f"{node['protocol']}://{node['host']}:{node['port']}"
+
+
+def _client_config(nearest: bool) -> Dict[str, Any]:
+    config: Dict[str, Any] = {
+        "nodes": typesense_nodes(),
         "api_key": os.getenv("TYPESENSE_API"),  # type: ignore
-        "connection_timeout_seconds": 30,
+        "connection_timeout_seconds": TYPESENSE_CONNECTION_TIMEOUT,
+        "num_retries": TYPESENSE_NUM_RETRIES,
+        "retry_interval_seconds": TYPESENSE_RETRY_INTERVAL,
+        "healthcheck_interval_seconds": TYPESENSE_HEALTHCHECK_INTERVAL,
     }
-)
+    nearest_node: Optional[str] = os.getenv("TYPESENSE_NEAREST_NODE")
+    if nearest and nearest_node:
+        config["nearest_node"] = nearest_node
+    return config
+
+
+# Writes prefer the nearest node (Typesense forwards them to the leader), while
+# reads are spread round-robin over every node. A node that fails is skipped
+# until `healthcheck_interval_seconds` has passed.
+ts_client: typesense.Client = typesense.Client(_client_config(nearest=True))  # type: ignore
+ts_read_client: typesense.Client = typesense.Client(_client_config(nearest=False))  # type: ignore
+
+
+def node_health(timeout: Optional[float] = None) -> Dict[str, bool]:
+    """
+    Probe the `/health` route of every configured node.
+
+    Returns:
+        Mapping of node URL to whether the node reported itself healthy.
+    """
+    health: Dict[str, bool] = {}
+    for node in typesense_nodes():
+        url: str = node_url(node)
+        try:
+            resp = requests.get(
+                f"{url}/health", timeout=timeout or TYPESENSE_CONNECTION_TIMEOUT
+            )
+            health[url] = resp.status_code == 200 and bool(resp.json().get("ok"))
+        except (requests.RequestException, ValueError):
+            health[url] = False
+    return health
 
 
 def iso_from_int(ts_ms: int) -> str:
@@ -36,13 +124,28 @@ def int_from_iso(iso_str: str) -> int:
     return int(dt.timestamp() * 1000)
 
 
+READING_FIELDS: Tuple[str, ...] = ("temperature", "pressure", "flow")
+
+
+def event_doc_id(sensor_id: str, ts_ms: int) -> str:
+    """
+    Deterministic document id for the reading of `sensor_id` at `ts_ms`, so
+    re-sending or re-importing the same reading overwrites instead of duplicating.
+    """
+    return hashlib.blake2b(f"{sensor_id}|{ts_ms}".encode(), digest_size=12).hexdigest()
+
+
 class SystemEventsDBHandler:
-    def __init__(self) -> None:
-        self.collection_name: str = "system_events"
+    def __init__(self, collection_name: str = "system_events") -> None:
+        self.collection_name: str = collection_name
         self.ts_client: typesense.Client = ts_client
+        self.ts_read_client: typesense.Client = ts_read_client
 
     def create_collection(self) -> Any:
-        if not self.get_collection():
+        collection: Union[bool, Any] = self.get_collection()
+        if collection:
+            self._make_readings_optional(collection)
+        else:
             self.ts_client.collections.create(
                 {
                     "name": self.collection_name,
@@ -50,9 +153,11 @@ class SystemEventsDBHandler:
                     "fields": [
                         {"name": "timestamp", "type": "int64"},
                         {"name": "sensor_id", "type": "string"},
-                        {"name": "temperature", "type": "float"},
-                        {"name": "pressure", "type": "float"},
-                        {"name": "flow", "type": "float"},
+                        # Readings are absent on dropouts raised by the monitor
+                        *(
+                            {"name": name, "type": "float", "optional": True}
+                            for name in READING_FIELDS
+                        ),
                         {"name": "is_anomaly", "type": "bool"},
                         {"name": "anomalies", "type": "object[]"},
                         {"name": "processed", "type": "bool"},
@@ -61,6 +166,29 @@ class SystemEventsDBHandler:
             )
         return self.ts_client.collections[self.collection_name].retrieve()
 
+    def _make_readings_optional(self, collection: Dict[str, Any]) -> None:
+        """
+        Collections created before the dropout monitor require every reading,
+        so they reject its dropout documents. Drop and re-add those fields as
+        optional; Typesense re-indexes them from the stored documents.
+        """
+        required: List[str] = [
+            field["name"]
+            for field in collection.get("fields", [])
+            if field["name"] in READING_FIELDS and not field.get("optional")
+        ]
+        if not required:
+            return
+        logger.info(f"Making {', '.join(required)} optional in {self.collection_name}")
+        self.ts_client.collections[self.collection_name].update(
+            {
+                "fields": [
+                    *({"name": name, "drop": True} for name in required),
+                    *({"name": name, "type": "float", "optional": True} for name in required),
+                ]
+            }
+        )
+
     def delete_collection(
         self, collection_name: Optional[str] = None
     ) -> Union[bool, Any]:
@@ -80,15 +208,100 @@ class SystemEventsDBHandler:
             return False
 
     def add_event(self, event: Dict[str, Any]) -> Any:
+        """
+        Store one event under its deterministic id.
+
+        Returns:
+            The created document, or `{"id": ..., "duplicate": true}` when the
+            reading is already stored (a retried request).
+        """
         iso_ts: Optional[str] = event.get("timestamp")
         if iso_ts:
             event["timestamp"] = int_from_iso(iso_ts)  # type: ignore
             event["processed"] = False
-            return self.ts_client.collections[self.collection_name].documents.create(
-                event  # type: ignore
-            )
+            event["id"] = event_doc_id(event["sensor_id"], event["timestamp"])
+            try:
+                return self.ts_client.collections[self.collection_name].documents.create(
+                    event  # type: ignore
+                )
+            except ObjectAlreadyExists:
+                return {"id": event["id"], "duplicate": True}
         return {"message": "No timestamp provided"}
 
+    def add_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Bulk-insert events with a single import call.
+
+        Returns:
+            One result per event, in order (`{"success": true, "id": ...}` or
+            `{"success": false, "error": ...}`). Readings that were already
+            stored come back as `{"success": true, "id": ..., "duplicate": true}`.
+        """
+        docs: List[Dict[str, Any]] = []
+        for event in events:
+            event["timestamp"] = int_from_iso(event["timestamp"])  # type: ignore
+            event["processed"] = False
+            event["id"] = event_doc_id(event["sensor_id"], event["timestamp"])
+            docs.append(event)
+        if not docs:
+            return []
+        results: List[Dict[str, Any]] = self.ts_client.collections[
+            self.collection_name
+        ].documents.import_(
+            docs, {"action": "create", "return_id": True}  # type: ignore
+        )
+        return [
+            {"success": True, "id": doc["id"], "duplicate": True}
+            if not result.get("success") and result.get("code") == 409
+            else result
+            for doc, result in zip(docs, results)
+        ]
+
+    def import_documents(
+        self, docs: List[Dict[str, Any]], action: str = "upsert"
+    ) -> List[Dict[str, Any]]:
+        """
+        Bulk-import ready-made documents (timestamps already in epoch ms).
+        """
+        if not docs:
+            return []
+        return self.ts_client.collections[self.collection_name].documents.import_(
+            docs, {"action": action}  # type: ignore
+        )
+
+    def export_events(self, filter_by: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Export stored documents, optionally restricted by a Typesense filter.
+        """
+        params: Dict[str, Any] = {"filter_by": filter_by} if filter_by else {}
+        jsonl: str = self.ts_read_client.collections[
+            self.collection_name
+        ].documents.export(params)  # type: ignore
+        return [json.loads(line) for line in jsonl.splitlines() if line.strip()]
+
+    def timestamp_range(self) -> Optional[Tuple[int, int]]:
+        """
+        Oldest and newest stored timestamps (epoch ms), or None when empty.
+        """
+        bounds: List[int] = []
+        for order in ("asc", "desc"):
+            resp: Dict[str, Any] = self.ts_read_client.collections[
+                self.collection_name
+            ].documents.search(
+                {
+                    "q": "*",
+                    "query_by": "sensor_id",
+                    "sort_by": f"timestamp:{order}",
+                    "per_page": 1,
+                    "include_fields": "timestamp",
+                }
+            )  # type: ignore
+            hits: List[Dict[str, Any]] = resp.get("hits", [])
+            if not hits:
+                return None
+            bounds.append(hits[0]["document"]["timestamp"])
+        return bounds[0], bounds[1]
+
     def set_process(self, events: List[Dict[str, Any]]) -> None:
         for event in events:
             event["timestamp"] = int_from_iso(event.get("timestamp"))  # type: ignore
@@ -129,7 +342,7 @@ class SystemEventsDBHandler:
 
         while True:
             try:
-                resp: Dict[str, Any] = self.ts_client.collections[
+                resp: Dict[str, Any] = self.ts_read_client.collections[
                     self.collection_name
                 ].documents.search(
                     {**base_search, "page": page}
@@ -177,6 +390,7 @@ class AnomalySummary:
     def __init__(self) -> None:
         self.collection_name: str = "anomaly_summary"
         self.ts: typesense.Client = ts_client
+        self.ts_read: typesense.Client = ts_read_client
 
     def create_collection(self) -> Any:
         if not self.get_collection():
@@ -239,7 +453,7 @@ class AnomalySummary:
 
         while len(collected) < limit:
             try:
-                resp: Dict[str, Any] = self.ts.collections[
+                resp: Dict[str, Any] = self.ts_read.collections[
                     self.collection_name
                 ].documents.search(
                     {**base_search, "page": page}  # type: ignore
@@ -0,0 +1,87 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Set
+
+NEW: str = "new"
+IN_FLIGHT: str = "in_flight"
+STORED: str = "stored"
+
+
+class RecentKeys:
+    """
+    Tracks recently ingested keys, used to answer client retries before they
+    reach detection or Typesense.
+
+    A key is claimed when a request starts handling it, and either committed
+    once the reading is stored or released if storing fails. Only committed
+    keys count as duplicates. A retry that arrives while the first request is
+    still running is told so, and is not told the reading was stored.
+
+    Committed keys are kept in a bounded LRU of `capacity` entries. Membership
+    is exact (no false positives), so a fresh reading is never rejected. Once
+    the oldest keys are evicted, the deterministic document id catches any
+    later retries.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity: int = max(0, capacity)
+        self._stored: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._in_flight: Set[Hashable] = set()
+        self._lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RecentKeys":
+        return cls(int(os.getenv("INGEST_DEDUP_CAPACITY", "100000")))
+
+    def claim(self, key: Optional[Hashable]) -> str:
+        """
+        Start handling `key`.
+
+        Returns:
+            NEW if the caller now owns the key and must `commit` or `release`
+            it. IN_FLIGHT if another request is storing it. STORED if it was
+            stored recently. Always NEW when `key` is None or tracking is
+            disabled.
+        """
+        if key is None or not self.capacity:
+            return NEW
+        with self._lock:
+            if key in self._stored:
+                self._stored.move_to_end(key)
+                return STORED
+            if key in self._in_flight:
+                return IN_FLIGHT
+            self._in_flight.add(key)
+            return NEW
+
+    def commit(self, key: Optional[Hashable]) -> None:
+        """
+        Mark a claimed key as stored.
+        """
+        if key is None or not self.capacity:
+            return
+        with self._lock:
+            self._in_flight.discard(key)
+            self._stored[key] = None
+            self._stored.move_to_end(key)
+            if len(self._stored) > self.capacity:
+                self._stored.popitem(last=False)
+
+    def release(self, key: Optional[Hashable]) -> None:
+        """
+        Give up a claimed key after a failed store, so a retry goes through.
+        """
+        if key is None:
+            return
+        with self._lock:
+            self._in_flight.discard(key)
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def __len__(self) -> int:
+        return len(self._stored)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._stored
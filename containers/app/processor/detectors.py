@@ -0,0 +1,367 @@
+import json
+import logging
+import math
+import os
+from abc import ABC, abstractmethod
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("detectors.py")
+
+PARAMETERS: Tuple[str, ...] = ("temperature", "pressure", "flow")
+UNITS: Dict[str, str] = {"temperature": "°C", "pressure": "bar", "flow": "L/min"}
+
+
+class Detector(ABC):
+    """
+    Online detector run once per (sensor, parameter) reading.
+
+    State lives in a flat array of doubles owned by the caller, so a detector
+    costs a fixed amount of memory and time per reading regardless of history.
+    """
+
+    name: str = ""
+    # Distinct from the rule types (spike, drift), which the summary prompt
+    # ties to specific parameters
+    type: str = ""
+    defaults: Dict[str, float] = {}
+
+    def check(self, params: Dict[str, float]) -> None:
+        """
+        Raise ValueError if `params` cannot be run; called once per sensor
+        and parameter when the bank is built.
+        """
+        for key, value in params.items():
+            if not math.isfinite(value):
+                raise ValueError(f"{self.name}: {key} must be finite")
+
+    @abstractmethod
+    def new_state(self, params: Dict[str, float]) -> array: ...
+
+    @abstractmethod
+    def update(
+        self, state: array, params: Dict[str, float], value: float, ts: float
+    ) -> Optional[float]:
+        """
+        Feed one reading and return the detector score if it fires, else None.
+        """
+
+    @abstractmethod
+    def message(
+        self, parameter: str, value: float, score: float, params: Dict[str, float]
+    ) -> str: ...
+
+
+class ZScoreDetector(Detector):
+    """
+    Exponentially weighted mean/variance; fires when |z| exceeds `threshold`.
+
+    The first `warmup` readings use Welford's running mean (alpha = 1/n),
+    after which the estimate decays with `alpha`.
+    """
+
+    name = "zscore"
+    type = "outlier"
+    defaults = {"threshold": 4.0, "alpha": 0.05, "warmup": 30}
+
+    def check(self, params: Dict[str, float]) -> None:
+        super().check(params)
+        if not 0.0 < params["alpha"] <= 1.0:
+            raise ValueError(f"{self.name}: alpha must be in (0, 1]")
+
+    # state: [n, mean, var]
+    def new_state(self, params: Dict[str, float]) -> array:
+        return array("d", (0.0, 0.0, 0.0))
+
+    def update(
+        self, state: array, params: Dict[str, float], value: float, ts: float
+    ) -> Optional[float]:
+        n: float = state[0] + 1.0
+        mean: float = state[1]
+        var: float = state[2]
+
+        score: Optional[float] = None
+        if n > params["warmup"] and var > 0.0:
+            z: float = (value - mean) / math.sqrt(var)
+            if abs(z) > params["threshold"]:
+                score = z
+
+        alpha: float = max(params["alpha"], 1.0 / n)
+        diff: float = value - mean
+        incr: float = alpha * diff
+        state[0] = n
+        state[1] = mean + incr
+        state[2] = (1.0 - alpha) * (var + diff * incr)
+        return score
+
+    def message(
+        self, parameter: str, value: float, score: float, params: Dict[str, float]
+    ) -> str:
+        return (
+            f"{parameter.capitalize()} outlier: {value:.2f} {UNITS.get(parameter, '')} "
+            f"(z-score {score:.1f}, threshold {params['threshold']:g})"
+        )
+
+
+class CusumDetector(Detector):
+    """
+    Two-sided CUSUM for slow drift away from the baseline learned during
+    `warmup`. `k` (slack) and `h` (decision interval) are in standard
+    deviations of the baseline; the sums reset after each alarm.
+    """
+
+    name = "cusum"
+    type = "shift"
+    defaults = {"k": 0.5, "h": 8.0, "warmup": 30}
+
+    # state: [n, mean, m2, s_pos, s_neg]
+    def new_state(self, params: Dict[str, float]) -> array:
+        return array("d", (0.0, 0.0, 0.0, 0.0, 0.0))
+
+    def update(
+        self, state: array, params: Dict[str, float], value: float, ts: float
+    ) -> Optional[float]:
+        n: float = state[0]
+        if n < params["warmup"]:
+            n += 1.0
+            diff: float = value - state[1]
+            state[0] = n
+            state[1] += diff / n
+            state[2] += diff * (value - state[1])
+            return None
+
+        sigma: float = math.sqrt(state[2] / n) or 1.0
+        dev: float = (value - state[1]) / sigma
+        s_pos: float = max(0.0, state[3] + dev - params["k"])
+        s_neg: float = max(0.0, state[4] - dev - params["k"])
+
+        if s_pos > params["h"] or s_neg > params["h"]:
+            state[3] = state[4] = 0.0
+            return s_pos if s_pos > s_neg else -s_neg
+
+        state[3] = s_pos
+        state[4] = s_neg
+        return None
+
+    def message(
+        self, parameter: str, value: float, score: float, params: Dict[str, float]
+    ) -> str:
+        direction: str = "upward" if score > 0 else "downward"
+        return (
+            f"{parameter.capitalize()} drifting {direction}: {value:.2f} "
+            f"{UNITS.get(parameter, '')} (CUSUM {abs(score):.1f}, threshold {params['h']:g})"
+        )
+
+
+class RateOfChangeDetector(Detector):
+    """
+    Fires when the change over the last `window` readings exceeds
+    `max_rate` units per second. Readings are kept in a fixed ring buffer.
+    """
+
+    name = "rate"
+    type = "rate_of_change"
+    defaults = {"max_rate": 1.0, "window": 5}
+
+    def check(self, params: Dict[str, float]) -> None:
+        super().check(params)
+        if params["window"] < 1 or params["window"] != int(params["window"]):
+            raise ValueError(f"{self.name}: window must be a whole number >= 1")
+
+    # state: [count, head, t0, v0, t1, v1, ...]
+    def new_state(self, params: Dict[str, float]) -> array:
+        return array("d", bytes(8 * (2 + 2 * int(params["window"]))))
+
+    def update(
+        self, state: array, params: Dict[str, float], value: float, ts: float
+    ) -> Optional[float]:
+        window: int = int(params["window"])
+        count: int = int(state[0])
+        head: int = int(state[1])
+        slot: int = 2 + 2 * head
+
+        score: Optional[float] = None
+        if count >= window:
+            # The slot about to be overwritten holds the oldest reading
+            elapsed: float = ts - state[slot]
+            if elapsed > 0.0:
+                rate: float = (value - state[slot + 1]) / elapsed
+                if abs(rate) > params["max_rate"]:
+                    score = rate
+
+        state[slot] = ts
+        state[slot + 1] = value
+        state[0] = min(count + 1, window)
+        state[1] = (head + 1) % window
+        return score
+
+    def message(
+        self, parameter: str, value: float, score: float, params: Dict[str, float]
+    ) -> str:
+        unit: str = UNITS.get(parameter, "")
+        return (
+            f"{parameter.capitalize()} changing at {score:+.2f} {unit}/s to {value:.2f} {unit} "
+            f"(threshold {params['max_rate']:g} {unit}/s)"
+        )
+
+
+DETECTORS: Dict[str, Detector] = {
+    detector.name: detector
+    for detector in (ZScoreDetector(), CusumDetector(), RateOfChangeDetector())
+}
+
+
+class DetectorBank:
+    """
+    Runs the configured detectors for every sensor and parameter.
+
+    Config (JSON):
+        {
+          "parameters": ["temperature", "pressure", "flow"],
+          "detectors": {"zscore": {"threshold": 4.0}, "cusum": {}},
+          "sensors": {"wtf-pipe-7": {"zscore": {"threshold": 3.0}}}
+        }
+
+    `detectors` enables detectors and overrides their defaults; `sensors`
+    overrides those again per sensor, optionally keyed by parameter
+    (e.g. {"zscore": {"flow": {"threshold": 5.0}}}).
+    """
+
+    def __init__(self, config: Dict[str, Any]) -> None:
+        self.parameters: Tuple[str, ...] = tuple(config.get("parameters", PARAMETERS))
+        self.detectors: Dict[str, Dict[str, Any]] = config.get("detectors", {})
+        self.sensors: Dict[str, Dict[str, Any]] = config.get("sensors", {})
+
+        unknown: List[str] = [p for p in self.parameters if p not in PARAMETERS]
+        if unknown:
+            raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+        if not isinstance(self.detectors, dict) or not isinstance(self.sensors, dict):
+            raise ValueError("detectors and sensors must be objects")
+        unknown = [name for name in self.detectors if name not in DETECTORS]
+        if unknown:
+            raise ValueError(f"Unknown detectors: {', '.join(unknown)}")
+
+        # Every layer is resolved and checked here, so a bad config fails at
+        # startup instead of on a sensor's first reading.
+        # sensor_id (None for the default) -> [(detector, parameter, params)]
+        self._resolved: Dict[
+            Optional[str], List[Tuple[Detector, str, Dict[str, float]]]
+        ] = {None: self._resolve(None)}
+        for sensor_id, overrides in self.sensors.items():
+            if not isinstance(overrides, dict):
+                raise ValueError(f"Sensor {sensor_id}: overrides must be an object")
+            unknown = [name for name in overrides if name not in self.detectors]
+            if unknown:
+                raise ValueError(
+                    f"Sensor {sensor_id}: unknown or disabled detectors: {', '.join(unknown)}"
+                )
+            self._resolved[sensor_id] = self._resolve(sensor_id)
+
+        # sensor_id -> [(detector, parameter, params, state)], built on first sight
+        self._plans: Dict[
+            str, List[Tuple[Detector, str, Dict[str, float], array]]
+        ] = {}
+
+    @classmethod
+    def from_file(cls, path: str) -> "DetectorBank":
+        with open(path) as fh:
+            return cls(json.load(fh))
+
+    def _params(
+        self, sensor_id: Optional[str], name: str, parameter: str
+    ) -> Dict[str, float]:
+        detector: Detector = DETECTORS[name]
+        params: Dict[str, float] = {**detector.defaults}
+        base: Dict[str, Any] = self.detectors.get(name) or {}
+        override: Dict[str, Any] = (
+            self.sensors.get(sensor_id, {}).get(name) or {} if sensor_id else {}
+        )
+        for layer in (base, base.get(parameter), override, override.get(parameter)):
+            if not layer:
+                continue
+            if not isinstance(layer, dict):
+                raise ValueError(f"{name}: settings must be an object, got {layer!r}")
+            for key, value in layer.items():
+                if isinstance(value, dict):
+                    if key not in PARAMETERS:
+                        raise ValueError(f"{name}: unknown parameter {key}")
+                    continue
+                if key not in detector.defaults and key != "enabled":
+                    raise ValueError(f"{name}: unknown setting {key}")
+                try:
+                    params[key] = float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"{name}: {key} must be a number, got {value!r}")
+        return params
+
+    def _resolve(
+        self, sensor_id: Optional[str]
+    ) -> List[Tuple[Detector, str, Dict[str, float]]]:
+        resolved: List[Tuple[Detector, str, Dict[str, float]]] = []
+        for name in self.detectors:
+            for parameter in self.parameters:
+                params: Dict[str, float] = self._params(sensor_id, name, parameter)
+                if params.get("enabled", 1.0):
+                    detector: Detector = DETECTORS[name]
+                    try:
+                        detector.check(params)
+                    except ValueError as exc:
+                        where: str = f"sensor {sensor_id}, " if sensor_id else ""
+                        raise ValueError(f"{exc} ({where}{parameter})")
+                    resolved.append((detector, parameter, params))
+        return resolved
+
+    def _plan(self, sensor_id: str) -> List[Tuple[Detector, str, Dict[str, float], array]]:
+        resolved = self._resolved.get(sensor_id, self._resolved[None])
+        plan: List[Tuple[Detector, str, Dict[str, float], array]] = [
+            (detector, parameter, params, detector.new_state(params))
+            for detector, parameter, params in resolved
+        ]
+        self._plans[sensor_id] = plan
+        return plan
+
+    def run(
+        self, sensor_id: str, event: Dict[str, Any], ts: float
+    ) -> List[Dict[str, Any]]:
+        plan = self._plans.get(sensor_id) or self._plan(sensor_id)
+        anomalies: List[Dict[str, Any]] = []
+
+        for detector, parameter, params, state in plan:
+            value: Optional[float] = event.get(parameter)
+            if value is None:
+                continue
+            score: Optional[float] = detector.update(state, params, value, ts)
+            if score is not None:
+                anomalies.append(
+                    {
+                        "type": detector.type,
+                        "detector": detector.name,
+                        "timestamp": event["timestamp"],
+                        "sensor_id": sensor_id,
+                        "parameter": parameter,
+                        "value": value,
+                        "score": round(score, 3),
+                        "message": detector.message(parameter, value, score, params),
+                    }
+                )
+
+        return anomalies
+
+
+def load_detectors() -> Optional[DetectorBank]:
+    """
+    Build the detector bank from the JSON file named by `DETECTORS_CONFIG`,
+    or return None when streaming detectors are not configured.
+
+    Raises:
+        OSError, ValueError: If the file cannot be read or fails validation.
+    """
+    path: Optional[str] = os.getenv("DETECTORS_CONFIG")
+    if not path:
+        return None
+    try:
+        return DetectorBank.from_file(path)
+    except (OSError, ValueError) as exc:
+        # Fail at startup, as a broken rules file does
+        logger.error(f"Could not load detectors from {path}: {exc}")
+        raise
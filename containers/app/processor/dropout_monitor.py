@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from processor.timing_wheel import TimingWheel
+
+logger = logging.getLogger("dropout_monitor.py")
+
+
+class DropoutMonitor:
+    """
+    Flags sensors that stop reporting, without waiting for their next event.
+
+    Every event re-arms the sensor's deadline (now + threshold) on a timing
+    wheel; a background thread turns the wheel and hands the dropout anomalies
+    of each tick to `on_dropouts` in one call, so a gateway outage costs one
+    bulk write rather than one write per sensor.
+
+    `on_dropouts` returns the ids of the sensors whose dropout it stored. Only
+    those count as reported; for the rest the tracker raises the dropout when
+    the sensor comes back, as it would without a monitor.
+    """
+
+    def __init__(
+        self,
+        on_dropouts: Callable[[List[Dict[str, Any]]], Iterable[str]],
+        threshold_seconds: float = 10.0,
+        tick_seconds: float = 0.1,
+    ) -> None:
+        self.on_dropouts: Callable[[List[Dict[str, Any]]], Iterable[str]] = on_dropouts
+        self.threshold_seconds: float = threshold_seconds
+        self.tick_seconds: float = tick_seconds
+        self.wheel: TimingWheel = TimingWheel(
+            tick_seconds=tick_seconds, start=time.monotonic()
+        )
+        self.last_seen: Dict[str, float] = {}
+        self.thresholds: Dict[str, float] = {}
+        self.reported: Set[str] = set()
+        self._lock: threading.Lock = threading.Lock()
+        self._stop: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def touch(self, sensor_id: str, threshold_seconds: Optional[float] = None) -> bool:
+        """
+        Record that `sensor_id` just reported and push its deadline forward by
+        `threshold_seconds` (defaults to the monitor-wide threshold).
+
+        Returns:
+            True if a dropout was already stored for the silence that this
+            event ends, so the caller reports the full gap as its end rather
+            than as a new dropout.
+        """
+        now: float = time.monotonic()
+        with self._lock:
+            threshold: float = threshold_seconds or self.threshold_seconds
+            self.wheel.schedule(sensor_id, now + threshold)
+            self.last_seen[sensor_id] = now
+            self.thresholds[sensor_id] = threshold
+            if sensor_id in self.reported:
+                self.reported.discard(sensor_id)
+                return True
+        return False
+
+    def check(self) -> None:
+        """
+        Advance the wheel to now and emit the dropouts of every expired sensor.
+        """
+        now: float = time.monotonic()
+        with self._lock:
+            expired = self.wheel.advance(now)
+            # sensor_id -> (last seen, threshold)
+            silence: Dict[str, Tuple[float, float]] = {
+                sensor_id: (self.last_seen[sensor_id], self.thresholds[sensor_id])  # type: ignore
+                for sensor_id in expired
+            }
+
+        if not silence:
+            return
+        timestamp: str = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        anomalies: List[Dict[str, Any]] = [
+            {
+                "type": "dropout",
+                "timestamp": timestamp,
+                "sensor_id": sensor_id,
+                "parameter": None,
+                "value": None,
+                "duration_seconds": int(now - seen),
+                "message": f"No data for {now - seen:.1f}s (threshold {threshold:g}s) on {sensor_id}",
+            }
+            for sensor_id, (seen, threshold) in silence.items()
+        ]
+        try:
+            stored: Iterable[str] = self.on_dropouts(anomalies)
+        except Exception as exc:
+            logger.error(f"Failed to store {len(anomalies)} dropouts: {exc}")
+            return
+
+        with self._lock:
+            for sensor_id in stored:
+                # A sensor that reported while the dropout was being stored
+                # has already had its gap handled by the tracker
+                if self.last_seen.get(sensor_id) == silence[sensor_id][0]:
+                    self.reported.add(sensor_id)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.tick_seconds):
+            self.check()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="dropout-monitor", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Dropout monitor started (threshold {self.threshold_seconds:g}s)"
+        )
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,263 @@
+import bisect
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger("metrics.py")
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)  # fmt: skip
+
+LabelValues = Tuple[str, ...]
+
+
+def _labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs: List[str] = [
+        '{}="{}"'.format(
+            name, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        )
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric(ABC):
+    type: str = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: Tuple[str, ...] = labelnames
+        self._lock: threading.Lock = threading.Lock()
+        REGISTRY.register(self)
+
+    @abstractmethod
+    def samples(self) -> List[str]: ...
+
+    def render(self) -> str:
+        lines: List[str] = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self._values: Dict[LabelValues, float] = {}
+        super().__init__(name, documentation, labelnames)
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {v}" for k, v in items]
+
+
+class Gauge(Metric):
+    """
+    Gauge set directly, or computed at scrape time with `set_function`.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+        super().__init__(name, documentation, labelnames)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def samples(self) -> List[str]:
+        if self._function is not None:
+            try:
+                return [f"{self.name} {float(self._function())}"]
+            except Exception as exc:
+                logger.debug(f"Gauge {self.name} failed: {exc}")
+                return []
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {v}" for k, v in items]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.buckets: Tuple[float, ...] = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float, *labels: str) -> None:
+        index: int = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series: Optional[List[float]] = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines: List[str] = []
+        for labels, series in items:
+            cumulative: float = 0.0
+            for bound, count in zip((*self.buckets, float("inf")), series):
+                cumulative += count
+                le: str = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels: str = _labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+        return "\n".join(m.render() for m in self.metrics.values()) + "\n"
+
+
+REGISTRY: Registry = Registry()
+CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+# Ingest path (web)
+HTTP_REQUEST_SECONDS: Histogram = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+)
+INGEST_STAGE_SECONDS: Histogram = Histogram(
+    "ingest_stage_duration_seconds",
+    "Latency of each ingest stage (validation, detection, store).",
+    ("stage",),
+)
+INGEST_EVENTS: Counter = Counter(
+    "ingest_events_total", "Events received, by outcome.", ("outcome",)
+)
+INGEST_DUPLICATES: Counter = Counter(
+    "ingest_duplicates_suppressed_total",
+    "Retried readings dropped, by where they were caught (memory, store).",
+    ("layer",),
+)
+INGEST_ANOMALIES: Counter = Counter(
+    "ingest_anomalies_total", "Anomalies detected at ingest, by type.", ("type",)
+)
+INGEST_IN_FLIGHT: Gauge = Gauge(
+    "ingest_in_flight_requests", "Ingest requests currently being handled."
+)
+INGEST_DEDUP_KEYS: Gauge = Gauge(
+    "ingest_dedup_keys", "Recent (sensor_id, timestamp) keys held for duplicate suppression."
+)
+DROPOUT_TIMERS: Gauge = Gauge(
+    "dropout_monitor_armed_timers", "Sensors with a pending dropout deadline."
+)
+
+# Summary path (manager)
+SUMMARY_STAGE_SECONDS: Histogram = Histogram(
+    "summary_stage_duration_seconds",
+    "Latency of each summary stage (search, grouping, llm, add_summary, set_process).",
+    ("stage",),
+)
+SUMMARY_RUNS: Counter = Counter(
+    "summary_runs_total", "Summary job runs, by outcome.", ("outcome",)
+)
+SUMMARY_PENDING: Gauge = Gauge(
+    "summary_pending_anomalies", "Unprocessed anomaly events picked up by the last run."
+)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        from processor.profiler import ProfileError, profile_request
+
+        parsed = urlparse(self.path)
+        if parsed.path == "/metrics":
+            self._reply(200, REGISTRY.render(), CONTENT_TYPE)
+        elif parsed.path == "/debug/profile":
+            query: Dict[str, List[str]] = parse_qs(parsed.query)
+            try:
+                body: str = profile_request(
+                    seconds=float(query.get("seconds", ["10"])[0]),
+                    token=self.headers.get("X-Profile-Token"),
+                )
+            except ProfileError as exc:
+                self._reply(exc.status, exc.detail, "text/plain; charset=utf-8")
+                return
+            except ValueError:
+                self._reply(400, "seconds must be a number", "text/plain; charset=utf-8")
+                return
+            self._reply(200, body, "text/plain; charset=utf-8")
+        else:
+            self._reply(404, "Not Found", "text/plain; charset=utf-8")
+
+    def _reply(self, status: int, body: str, content_type: str) -> None:
+        data: bytes = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: object) -> None:
+        logger.debug(format % args)
+
+
+def serve(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Expose /metrics and /debug/profile on a background thread, for processes
+    that have no web app of their own (the summary manager).
+    """
+    server: ThreadingHTTPServer = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"Metrics available on :{port}/metrics")
+    return server
@@ -0,0 +1,82 @@
+import collections
+import hmac
+import os
+import sys
+import threading
+import time
+from typing import Counter, Dict, List, Optional
+
+MAX_PROFILE_SECONDS: float = 120.0
+
+_profile_lock: threading.Lock = threading.Lock()
+
+
+class ProfileError(Exception):
+    def __init__(self, status: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status: int = status
+        self.detail: str = detail
+
+
+def sample_profile(seconds: float, interval: float = 0.005) -> str:
+    """
+    Sample the stacks of every thread in this process for `seconds`.
+
+    Returns:
+        Collapsed stacks ("outer;inner;leaf count" per line, hottest first),
+        the input format of flamegraph.pl and speedscope. Idle threads parked
+        in the profiler itself are left out.
+    """
+    own_id: int = threading.get_ident()
+    names: Dict[int, str] = {t.ident: t.name for t in threading.enumerate() if t.ident}
+    stacks: Counter[str] = collections.Counter()
+    deadline: float = time.monotonic() + seconds
+    samples: int = 0
+
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            frames: List[str] = []
+            current: Optional[object] = frame
+            while current is not None:
+                code = current.f_code  # type: ignore
+                frames.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{current.f_lineno})"  # type: ignore
+                )
+                current = current.f_back  # type: ignore
+            frames.append(names.get(thread_id, f"thread-{thread_id}"))
+            stacks[";".join(reversed(frames))] += 1
+        samples += 1
+        time.sleep(interval)
+
+    lines: List[str] = [
+        f"# {samples} samples every {interval * 1000:g}ms over {seconds:g}s, pid {os.getpid()}"
+    ]
+    lines.extend(f"{stack} {count}" for stack, count in stacks.most_common())
+    return "\n".join(lines) + "\n"
+
+
+def profile_request(seconds: float, token: Optional[str]) -> str:
+    """
+    Run `sample_profile` on behalf of an HTTP caller.
+
+    Profiling is off unless PROFILING_TOKEN is set, the caller must present
+    that token, and only one profile runs at a time.
+
+    Raises:
+        ProfileError: With the HTTP status to return when the request is refused.
+    """
+    expected: Optional[str] = os.getenv("PROFILING_TOKEN")
+    if not expected:
+        raise ProfileError(404, "Profiling is disabled")
+    if not hmac.compare_digest((token or "").encode(), expected.encode()):
+        raise ProfileError(403, "Invalid profiling token")
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise ProfileError(400, f"seconds must be between 0 and {MAX_PROFILE_SECONDS:g}")
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfileError(409, "A profile is already running")
+    try:
+        return sample_profile(seconds)
+    finally:
+        _profile_lock.release()
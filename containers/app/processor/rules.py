@@ -0,0 +1,219 @@
+import json
+import logging
+import operator
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from processor.detectors import PARAMETERS
+
+logger = logging.getLogger("rules.py")
+
+DEFAULT_RULES_PATH: str = os.path.join(os.path.dirname(__file__), "rules.json")
+
+COMPARATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class CompiledRule(NamedTuple):
+    name: str
+    type: str
+    parameter: str
+    compare: Callable[[Any, Any], bool]
+    threshold: float
+    duration: float
+    message: str
+
+
+class RulePlan(NamedTuple):
+    """
+    Flat, immutable evaluation plan for one sensor.
+    """
+
+    dropout_threshold: float
+    dropout_message: str
+    rules: Tuple[CompiledRule, ...]
+
+
+def _number(owner: str, field: str, value: Any) -> float:
+    """
+    `value` as a number; JSON ints are kept as they are so messages render
+    "120", not "120.0".
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{owner}: {field} must be a number, got {value!r}")
+
+
+def _check_template(owner: str, template: Any, **sample: Any) -> str:
+    """
+    Format `template` once with sample values, so a bad placeholder fails
+    the load instead of every event that fires the rule.
+    """
+    try:
+        template.format(**sample)
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"{owner}: invalid message template {template!r}: {exc!r}")
+    return template
+
+
+def _compile_rule(rule: Dict[str, Any], override: Dict[str, Any]) -> CompiledRule:
+    merged: Dict[str, Any] = {**rule, **override}
+    name: str = merged["name"]
+    comparator: str = merged.get("comparator", ">")
+    if comparator not in COMPARATORS:
+        raise ValueError(f"Rule {name}: unknown comparator {comparator}")
+    threshold: float = _number(f"Rule {name}", "threshold", merged["threshold"])
+    duration: float = _number(f"Rule {name}", "duration", merged.get("duration", 0))
+    parameter: str = merged["parameter"]
+    if parameter not in PARAMETERS:
+        raise ValueError(f"Rule {name}: unknown parameter {parameter}")
+    return CompiledRule(
+        name=name,
+        type=merged.get("type", "spike"),
+        parameter=parameter,
+        compare=COMPARATORS[comparator],
+        threshold=threshold,
+        duration=duration,
+        message=_check_template(
+            f"Rule {name}",
+            merged["message"],
+            value=1.0,
+            threshold=threshold,
+            duration=duration,
+            duration_seconds=1,
+            parameter=parameter,
+            sensor_id="sensor",
+        ),
+    )
+
+
+def compile_rules(config: Dict[str, Any]) -> Tuple[RulePlan, Dict[str, RulePlan]]:
+    """
+    Compile a rules config into the default plan plus one plan per sensor
+    that has overrides.
+
+    Config (JSON):
+        {
+          "dropout": {"threshold": 10, "message": "..."},
+          "rules": [{"name": "pressure_spike", "type": "spike",
+                     "parameter": "pressure", "comparator": ">",
+                     "threshold": 4.0, "duration": 0, "message": "..."}],
+          "sensors": {"wtf-pipe-7": {"pressure_spike": {"threshold": 4.5},
+                                     "dropout": {"threshold": 20}}}
+        }
+
+    Messages are `str.format` templates over value, threshold, duration,
+    duration_seconds, parameter, sensor_id and (for dropouts) delta.
+    """
+    dropout: Dict[str, Any] = config.get("dropout", {})
+    rules: List[Dict[str, Any]] = config.get("rules", [])
+    sensors: Dict[str, Dict[str, Any]] = config.get("sensors", {})
+    if not isinstance(rules, list) or not all(isinstance(rule, dict) for rule in rules):
+        raise ValueError("rules must be a list of objects")
+    if not isinstance(sensors, dict) or not all(
+        isinstance(overrides, dict) for overrides in sensors.values()
+    ):
+        raise ValueError("sensors must map sensor ids to objects")
+
+    names: List[str] = [rule["name"] for rule in rules]
+    if len(set(names)) != len(names):
+        raise ValueError("Rule names must be unique")
+    for sensor_id, overrides in sensors.items():
+        unknown: List[str] = [
+            key for key in overrides if key != "dropout" and key not in names
+        ]
+        if unknown:
+            raise ValueError(f"Sensor {sensor_id}: unknown rules: {', '.join(unknown)}")
+
+    def build(overrides: Dict[str, Any]) -> RulePlan:
+        sensor_dropout: Dict[str, Any] = {**dropout, **overrides.get("dropout", {})}
+        dropout_threshold: float = _number(
+            "Dropout", "threshold", sensor_dropout.get("threshold", 10)
+        )
+        return RulePlan(
+            dropout_threshold=dropout_threshold,
+            dropout_message=_check_template(
+                "Dropout",
+                sensor_dropout.get(
+                    "message",
+                    "No data for {delta:.1f}s (threshold {threshold}s) on {sensor_id}",
+                ),
+                delta=1.0,
+                threshold=dropout_threshold,
+                sensor_id="sensor",
+            ),
+            rules=tuple(
+                _compile_rule(rule, overrides.get(rule["name"], {}))
+                for rule in rules
+                if overrides.get(rule["name"], {}).get("enabled", True)
+            ),
+        )
+
+    return build({}), {
+        sensor_id: build(overrides)
+        for sensor_id, overrides in sensors.items()
+    }
+
+
+class RuleEngine:
+    """
+    Serves compiled rule plans and reloads them when the config file changes.
+
+    The file's mtime is checked at most once every `reload_interval` seconds;
+    a config that fails to load is logged and the previous plans are kept.
+    """
+
+    def __init__(self, path: str = DEFAULT_RULES_PATH, reload_interval: float = 5.0) -> None:
+        self.path: str = path
+        self.reload_interval: float = reload_interval
+        self._mtime: float = 0.0
+        self._next_check: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+        self._plans: Tuple[RulePlan, Dict[str, RulePlan]] = self._load()
+
+    @classmethod
+    def from_env(cls) -> "RuleEngine":
+        return cls(
+            path=os.getenv("RULES_CONFIG") or DEFAULT_RULES_PATH,
+            reload_interval=float(os.getenv("RULES_RELOAD_INTERVAL", "5")),
+        )
+
+    def _load(self) -> Tuple[RulePlan, Dict[str, RulePlan]]:
+        self._mtime = os.stat(self.path).st_mtime
+        with open(self.path) as fh:
+            return compile_rules(json.load(fh))
+
+    def reload(self) -> bool:
+        """
+        Recompile the rules if the config file changed since the last load.
+        """
+        with self._lock:
+            try:
+                if os.stat(self.path).st_mtime == self._mtime:
+                    return False
+                self._plans = self._load()
+            except Exception as exc:
+                logger.error(f"Keeping previous rules, could not load {self.path}: {exc}")
+                return False
+        logger.info(f"Reloaded rules from {self.path}")
+        return True
+
+    def plan(self, sensor_id: str) -> RulePlan:
+        if self.reload_interval:
+            now: float = time.monotonic()
+            if now >= self._next_check:
+                self._next_check = now + self.reload_interval
+                self.reload()
+        default, sensors = self._plans
+        return sensors.get(sensor_id, default)
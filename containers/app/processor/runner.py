@@ -1,14 +1,22 @@
 import asyncio
-import json
 import logging
+import os
+import time
 from typing import Any, Dict, List
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from processor.database import AnomalySummary, SystemEventsDBHandler
+from processor.metrics import (
+    SUMMARY_PENDING,
+    SUMMARY_RUNS,
+    SUMMARY_STAGE_SECONDS,
+    serve,
+)
 from processor.summarizer import generate_anomaly_summary
 
 INTERVAL_SECONDS: int = 30
+METRICS_PORT: int = int(os.getenv("METRICS_PORT", "9100"))
 
 scheduler: AsyncIOScheduler = AsyncIOScheduler()
 system_event_store: SystemEventsDBHandler = SystemEventsDBHandler()
@@ -46,26 +54,44 @@ def group_anomalies(intake: List[Dict[str, Any]]) -> Dict[str, Any]:
 
 
 async def summarize() -> None:
-    recent: List[Dict[str, Any]] = system_event_store.recent_unprocessed_anomalies()
+    started: float = time.perf_counter()
+    with SUMMARY_STAGE_SECONDS.time("search"):
+        recent: List[Dict[str, Any]] = system_event_store.recent_unprocessed_anomalies()
+    SUMMARY_PENDING.set(len(recent))
 
     if not recent:
+        SUMMARY_RUNS.inc("empty")
         return
 
-    to_model: Dict[str, Any] = group_anomalies(recent)
-    latest_summary: str = generate_anomaly_summary(to_model)
-
-    window_start: str = recent[-1]["timestamp"]  # type: ignore
-    window_end: str = recent[0]["timestamp"]  # type: ignore
-
-    anomaly_summary_store.add_summary(
-        window_start, window_end, len(recent), latest_summary
+    try:
+        with SUMMARY_STAGE_SECONDS.time("grouping"):
+            to_model: Dict[str, Any] = group_anomalies(recent)
+        with SUMMARY_STAGE_SECONDS.time("llm"):
+            latest_summary: str = generate_anomaly_summary(to_model)
+
+        window_start: str = recent[-1]["timestamp"]  # type: ignore
+        window_end: str = recent[0]["timestamp"]  # type: ignore
+
+        with SUMMARY_STAGE_SECONDS.time("add_summary"):
+            anomaly_summary_store.add_summary(
+                window_start, window_end, len(recent), latest_summary
+            )
+
+        with SUMMARY_STAGE_SECONDS.time("set_process"):
+            system_event_store.set_process(recent)
+    except Exception:
+        SUMMARY_RUNS.inc("error")
+        raise
+
+    SUMMARY_RUNS.inc("ok")
+    logger.debug(
+        f"Summarised {len(recent)} anomalous events in "
+        f"{time.perf_counter() - started:.2f}s\n{latest_summary}"
     )
 
-    system_event_store.set_process(recent)
-    # logger.info(f"\n{json.dumps(to_model, indent=2)}\n{latest_summary}\n\n")
-
 
 async def main() -> None:
+    serve(METRICS_PORT)
     scheduler.add_job(
         summarize,
         trigger=IntervalTrigger(seconds=INTERVAL_SECONDS),
@@ -0,0 +1,114 @@
+import math
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel keyed by an arbitrary hashable (e.g. sensor_id).
+
+    Time is measured in ticks of `tick_seconds`. Level `n` covers
+    `wheel_size ** (n + 1)` ticks; timers further out are parked on a higher
+    level and cascaded down as the wheel turns. Scheduling, rescheduling and
+    cancelling a key are O(1); each key holds at most one timer.
+    """
+
+    def __init__(
+        self,
+        tick_seconds: float = 0.1,
+        wheel_size: int = 64,
+        levels: int = 4,
+        start: float = 0.0,
+    ) -> None:
+        if wheel_size & (wheel_size - 1):
+            raise ValueError("wheel_size must be a power of two")
+
+        self.tick_seconds: float = tick_seconds
+        self.levels: int = levels
+        self._bits: int = wheel_size.bit_length() - 1
+        self._mask: int = wheel_size - 1
+        self._max_ticks: int = (1 << (self._bits * levels)) - 1
+        self._slots: List[List[Dict[Hashable, int]]] = [
+            [{} for _ in range(wheel_size)] for _ in range(levels)
+        ]
+        # key -> (level, slot, expiry tick)
+        self._timers: Dict[Hashable, Tuple[int, int, int]] = {}
+        self.current_tick: int = self._to_tick(start)
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def _to_tick(self, when: float) -> int:
+        return int(when / self.tick_seconds)
+
+    def _place(self, key: Hashable, expiry: int) -> None:
+        # Expiries at or before the current tick only reach here while
+        # cascading, and land in the level 0 slot that is expired next
+        delta: int = max(expiry - self.current_tick, 0)
+        if delta > self._max_ticks:
+            expiry = self.current_tick + self._max_ticks
+            delta = self._max_ticks
+
+        level: int = 0
+        while level < self.levels - 1 and delta >> (self._bits * (level + 1)):
+            level += 1
+
+        slot: int = (expiry >> (self._bits * level)) & self._mask
+        self._slots[level][slot][key] = expiry
+        self._timers[key] = (level, slot, expiry)
+
+    def schedule(self, key: Hashable, when: float) -> None:
+        """
+        Arm (or re-arm) the timer for `key` to expire at absolute time `when`.
+        """
+        self.cancel(key)
+        self._place(key, max(math.ceil(when / self.tick_seconds), self.current_tick + 1))
+
+    def cancel(self, key: Hashable) -> bool:
+        entry: Optional[Tuple[int, int, int]] = self._timers.pop(key, None)
+        if entry is None:
+            return False
+        level, slot, _ = entry
+        del self._slots[level][slot][key]
+        return True
+
+    def advance(self, now: float) -> List[Hashable]:
+        """
+        Turn the wheel up to `now` and return the keys whose timers expired.
+        """
+        target: int = self._to_tick(now)
+        expired: List[Hashable] = []
+
+        while self.current_tick < target:
+            if not self._timers:
+                self.current_tick = target
+                break
+
+            self.current_tick += 1
+            tick: int = self.current_tick
+
+            # Cascade every higher level whose block starts at this tick,
+            # outermost first so timers can fall through several levels
+            top: int = 0
+            while top < self.levels - 1 and not tick & (
+                (1 << (self._bits * (top + 1))) - 1
+            ):
+                top += 1
+            for level in range(top, 0, -1):
+                slot: int = (tick >> (self._bits * level)) & self._mask
+                bucket: Dict[Hashable, int] = self._slots[level][slot]
+                if bucket:
+                    self._slots[level][slot] = {}
+                    for key, expiry in bucket.items():
+                        self._place(key, expiry)
+
+            bucket = self._slots[0][tick & self._mask]
+            if bucket:
+                self._slots[0][tick & self._mask] = {}
+                for key in bucket:
+                    del self._timers[key]
+                    expired.append(key)
+
+        return expired
@@ -0,0 +1,409 @@
+import http.client
+import itertools
+import json
+import logging
+import math
+import queue
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("loadgen.py")
+
+SINGLE_PATH: str = "/system_event"
+BATCH_PATH: str = "/system_events/batch"
+EVENT_FIELDS: Tuple[str, ...] = ("timestamp", "sensor_id", "temperature", "pressure", "flow")
+
+
+def iso_from_ms(ts_ms: int) -> str:
+    return datetime.fromtimestamp(ts_ms / 1000.0, tz=timezone.utc).strftime(
+        "%Y-%m-%dT%H:%M:%S.%fZ"
+    )
+
+
+def ms_from_iso(iso_ts: str) -> int:
+    dt: datetime = datetime.fromisoformat(iso_ts.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+class SensorClock:
+    """
+    Send-time timestamps that strictly increase per sensor, in whole ms.
+
+    Ingest is idempotent per (sensor_id, timestamp in ms), so two readings of
+    one sensor stamped within the same millisecond would be answered as
+    duplicates and never reach detection or Typesense.
+    """
+
+    def __init__(self) -> None:
+        self.last: Dict[str, int] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def stamp(self, sensor_id: str) -> str:
+        now_ms: int = int(time.time() * 1000)
+        with self._lock:
+            ts_ms: int = max(now_ms, self.last.get(sensor_id, 0) + 1)
+            self.last[sensor_id] = ts_ms
+        return iso_from_ms(ts_ms)
+
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    """
+    Nearest-rank p50/p95/p99/max of `samples` (seconds), reported in ms.
+    """
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    ordered: List[float] = sorted(samples)
+
+    def rank(p: float) -> float:
+        return round(ordered[max(math.ceil(p * len(ordered)) - 1, 0)] * 1000, 3)
+
+    return {
+        "p50": rank(0.50),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+def synthetic_events(sensors: int, seed: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Endless stream of simulated readings spread round-robin over `sensors`,
+    each with a timestamp unique to its sensor.
+    """
+    from system_events.runner import (
+        STAGES,
+        WEIGHTS,
+        generate_drift,
+        generate_normal_data,
+        generate_spike,
+    )
+
+    rng: random.Random = random.Random(seed)
+    generators: Dict[str, Callable[[str], Dict[str, Any]]] = {
+        "normal": generate_normal_data,
+        "spike": generate_spike,
+        "drift": generate_drift,
+    }
+    # Dropouts are the absence of traffic, which a load test does not simulate
+    stages: List[str] = [stage for stage in STAGES if stage in generators]
+    weights: List[float] = [w for stage, w in zip(STAGES, WEIGHTS) if stage in generators]
+
+    clock: SensorClock = SensorClock()
+    for i in itertools.count():
+        sensor_id: str = f"wtf-pipe-{i % sensors + 1}"
+        stage: str = rng.choices(stages, weights=weights, k=1)[0]
+        event: Dict[str, Any] = generators[stage](sensor_id)
+        event["timestamp"] = clock.stamp(sensor_id)
+        yield event
+
+
+def replay_events(path: str, retime: bool = False, loop: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Stream events from an NDJSON file, one JSON object per line.
+
+    Integer (epoch ms) timestamps, as exported from Typesense, are converted
+    to ISO strings. With `retime`, every event is stamped with the send time
+    (unique per sensor). With `loop` and without `retime`, each later pass is
+    shifted past the end of the recording, so it is not answered as a
+    duplicate of the first.
+    """
+    clock: SensorClock = SensorClock()
+    first: Optional[int] = None
+    last: Optional[int] = None
+    for pass_number in itertools.count():
+        shift: int = 0
+        if pass_number and first is not None and last is not None:
+            shift = pass_number * (last - first + 1)
+        with open(path) as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record: Dict[str, Any] = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping invalid line in {path}")
+                    continue
+                event: Dict[str, Any] = {k: record.get(k) for k in EVENT_FIELDS}
+                if retime or event["timestamp"] is None:
+                    event["timestamp"] = clock.stamp(event["sensor_id"])
+                    yield event
+                    continue
+                try:
+                    ts_ms: int = (
+                        event["timestamp"]
+                        if isinstance(event["timestamp"], int)
+                        else ms_from_iso(event["timestamp"])
+                    )
+                except ValueError:
+                    yield event
+                    continue
+                if pass_number == 0:
+                    first = ts_ms if first is None else min(first, ts_ms)
+                    last = ts_ms if last is None else max(last, ts_ms)
+                event["timestamp"] = iso_from_ms(ts_ms + shift)
+                yield event
+        if not loop:
+            return
+
+
+class RateLimiter:
+    """
+    Hands out send slots `1 / rate` seconds apart across all workers.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.interval: float = 1.0 / rate if rate > 0 else 0.0
+        self._next: float = time.perf_counter()
+        self._lock: threading.Lock = threading.Lock()
+
+    def wait(self, events: int = 1) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            slot: float = max(self._next, time.perf_counter())
+            self._next = slot + self.interval * events
+        delay: float = slot - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class KeepAliveClient:
+    """
+    One persistent HTTP connection, reopened after errors.
+    """
+
+    def __init__(self, endpoint: str, timeout: float) -> None:
+        self.endpoint: str = endpoint
+        self.timeout: float = timeout
+        self.conn: Optional[http.client.HTTPConnection] = None
+
+    def post(self, path: str, payload: Any) -> Tuple[int, bytes]:
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.endpoint, timeout=self.timeout)
+            self.conn.connect()
+            # Small request/response pairs stall on Nagle + delayed ACK otherwise
+            self.conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            self.conn.request(
+                "POST",
+                path,
+                json.dumps(payload),
+                {"Content-Type": "application/json", "Connection": "keep-alive"},
+            )
+            response: http.client.HTTPResponse = self.conn.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            self.conn.close()
+            self.conn = None
+            raise
+
+
+class VisibilityProbe:
+    """
+    Measures how long after the ingest request started a document becomes
+    readable from Typesense, polling through the round-robin read client.
+    """
+
+    def __init__(self, workers: int = 2, timeout: float = 10.0, poll: float = 0.005) -> None:
+        from processor.database import SystemEventsDBHandler
+
+        self.store: SystemEventsDBHandler = SystemEventsDBHandler()
+        self.timeout: float = timeout
+        self.poll: float = poll
+        self.samples: List[float] = []
+        self.timeouts: int = 0
+        self._queue: "queue.Queue[Optional[Tuple[str, float]]]" = queue.Queue()
+        self._lock: threading.Lock = threading.Lock()
+        self._threads: List[threading.Thread] = [
+            threading.Thread(target=self._run, name=f"visibility-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, doc_id: str, started: float) -> None:
+        self._queue.put((doc_id, started))
+
+    def _visible(self, doc_id: str) -> bool:
+        from typesense.exceptions import ObjectNotFound
+
+        try:
+            self.store.ts_read_client.collections[self.store.collection_name].documents[
+                doc_id
+            ].retrieve()
+            return True
+        except ObjectNotFound:
+            return False
+
+    def _run(self) -> None:
+        while True:
+            item: Optional[Tuple[str, float]] = self._queue.get()
+            if item is None:
+                return
+            doc_id, started = item
+            while True:
+                try:
+                    visible: bool = self._visible(doc_id)
+                except Exception as exc:
+                    logger.debug(f"Visibility check failed for {doc_id}: {exc}")
+                    visible = False
+                elapsed: float = time.perf_counter() - started
+                if visible:
+                    with self._lock:
+                        self.samples.append(elapsed)
+                    break
+                if elapsed > self.timeout:
+                    with self._lock:
+                        self.timeouts += 1
+                    break
+                time.sleep(self.poll)
+
+    def close(self) -> None:
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+def _results(status: int, body: bytes) -> List[Dict[str, Any]]:
+    """
+    Per-event results of an ingest response (one for the single endpoint).
+    """
+    if status != 200:
+        return []
+    try:
+        parsed: Any = json.loads(body)
+    except json.JSONDecodeError:
+        return []
+    if isinstance(parsed, dict):
+        return [parsed]
+    return [item for item in parsed if isinstance(item, dict)]
+
+
+def run_load(
+    events: Iterator[Dict[str, Any]],
+    endpoint: str,
+    rate: float = 0.0,
+    concurrency: int = 4,
+    batch: int = 1,
+    limit: Optional[int] = None,
+    duration: Optional[float] = None,
+    visibility_every: int = 0,
+    timeout: float = 10.0,
+) -> Dict[str, Any]:
+    """
+    Drive the ingest endpoint and return throughput and latency figures.
+
+    Args:
+        events: Source of event dicts (synthetic or replayed).
+        endpoint: host:port of the web service.
+        rate: Target events per second across all workers (0 = unthrottled).
+        concurrency: Worker threads, each with its own keep-alive connection.
+        batch: Events per request; above 1 the batch endpoint is used.
+        limit: Stop after this many events.
+        duration: Stop after this many seconds.
+        visibility_every: Probe Typesense visibility for every Nth request (0 = off).
+        timeout: Per-request socket timeout in seconds.
+    """
+    source: Iterator[Dict[str, Any]] = (
+        itertools.islice(events, limit) if limit is not None else events
+    )
+    source_lock: threading.Lock = threading.Lock()
+    limiter: RateLimiter = RateLimiter(rate)
+    probe: Optional[VisibilityProbe] = VisibilityProbe() if visibility_every else None
+    deadline: Optional[float] = (
+        time.perf_counter() + duration if duration is not None else None
+    )
+
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    sent: List[int] = [0] * concurrency
+    errors: List[int] = [0] * concurrency
+    duplicates: List[int] = [0] * concurrency
+    statuses: Dict[int, int] = {}
+    requests_made: itertools.count = itertools.count(1)
+    stats_lock: threading.Lock = threading.Lock()
+
+    def worker(index: int) -> None:
+        client: KeepAliveClient = KeepAliveClient(endpoint, timeout)
+        while deadline is None or time.perf_counter() < deadline:
+            with source_lock:
+                chunk: List[Dict[str, Any]] = list(itertools.islice(source, batch))
+            if not chunk:
+                return
+
+            limiter.wait(len(chunk))
+            path: str = SINGLE_PATH if batch == 1 else BATCH_PATH
+            payload: Any = chunk[0] if batch == 1 else chunk
+
+            started: float = time.perf_counter()
+            try:
+                status, body = client.post(path, payload)
+            except (http.client.HTTPException, OSError) as exc:
+                logger.debug(f"Request failed: {exc}")
+                errors[index] += 1
+                continue
+            latencies[index].append(time.perf_counter() - started)
+            sent[index] += len(chunk)
+
+            with stats_lock:
+                statuses[status] = statuses.get(status, 0) + 1
+            if status != 200 or b'"error"' in body[:64]:
+                errors[index] += 1
+
+            results: List[Dict[str, Any]] = _results(status, body)
+            duplicates[index] += sum(1 for r in results if r.get("duplicate"))
+
+            if probe and next(requests_made) % visibility_every == 0:
+                # A duplicate was stored by an earlier request, so it is
+                # already visible and would skew the figures
+                fresh: List[str] = [
+                    r["id"] for r in results if r.get("id") and not r.get("duplicate")
+                ]
+                for doc_id in fresh[:1]:
+                    probe.submit(doc_id, started)
+
+    threads: List[threading.Thread] = [
+        threading.Thread(target=worker, args=(i,), name=f"load-{i}")
+        for i in range(concurrency)
+    ]
+    started_at: float = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed: float = time.perf_counter() - started_at
+
+    if probe:
+        probe.close()
+
+    all_latencies: List[float] = [lat for lats in latencies for lat in lats]
+    total_events: int = sum(sent)
+    total_duplicates: int = sum(duplicates)
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "batch": batch,
+        "target_rate": rate,
+        "elapsed_seconds": round(elapsed, 3),
+        "requests": len(all_latencies),
+        "events": total_events,
+        "errors": sum(errors),
+        # Answered as already stored: no detection and no Typesense write
+        "duplicates": total_duplicates,
+        "status_codes": {str(k): v for k, v in sorted(statuses.items())},
+        "throughput_events_per_second": round(total_events / elapsed, 1) if elapsed else 0.0,
+        "throughput_new_events_per_second": (
+            round((total_events - total_duplicates) / elapsed, 1) if elapsed else 0.0
+        ),
+        "ingest_latency_ms": percentiles(all_latencies),
+        "visibility_latency_ms": percentiles(probe.samples) if probe else None,
+        "visibility_samples": len(probe.samples) if probe else 0,
+        "visibility_timeouts": probe.timeouts if probe else 0,
+    }
@@ -1,3 +1,4 @@
+import argparse
 import http.client
 import json
 import logging
@@ -5,7 +6,7 @@ import os
 import random
 import time
 from datetime import datetime, timezone
-from typing import Dict, Union
+from typing import Any, Dict, List, Optional, Union
 
 logger = logging.getLogger("runner.py")
 
@@ -59,7 +60,7 @@ def send_data(data: Dict[str, Union[str, float]]) -> None:
         logger.error(f"Failed to send data: {exc}")
 
 
-def main() -> None:
+def simulate() -> None:
     while True:
         sensor_id: str = f"wtf-pipe-{random.randint(1, 10)}"
         anomaly_type: str = random.choices(STAGES, weights=WEIGHTS, k=1)[0]
@@ -78,6 +79,83 @@ def main() -> None:
                 simulate_dropout()
 
 
+def load(args: argparse.Namespace) -> Dict[str, Any]:
+    from system_events.loadgen import replay_events, run_load, synthetic_events
+
+    events = (
+        replay_events(args.replay, retime=args.retime, loop=args.loop)
+        if args.replay
+        else synthetic_events(args.sensors, seed=args.seed)
+    )
+    report: Dict[str, Any] = run_load(
+        events,
+        endpoint=args.endpoint,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        batch=args.batch,
+        limit=args.events,
+        duration=args.duration,
+        visibility_every=args.visibility_every,
+        timeout=args.timeout,
+    )
+
+    ingest: Dict[str, Optional[float]] = report["ingest_latency_ms"]
+    logger.info(
+        f"{report['events']} events in {report['elapsed_seconds']}s "
+        f"({report['throughput_events_per_second']} events/s, {report['errors']} errors, "
+        f"{report['duplicates']} duplicates); "
+        f"ingest p50={ingest['p50']}ms p95={ingest['p95']}ms p99={ingest['p99']}ms"
+    )
+    visible: Optional[Dict[str, Optional[float]]] = report["visibility_latency_ms"]
+    if visible:
+        logger.info(
+            f"Typesense visibility over {report['visibility_samples']} samples: "
+            f"p50={visible['p50']}ms p95={visible['p95']}ms p99={visible['p99']}ms "
+            f"({report['visibility_timeouts']} timeouts)"
+        )
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Simulate sensors (default) or load-test the ingest endpoint."
+    )
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("simulate", help="Send a simulated reading every 2s (default)")
+
+    load_parser = commands.add_parser("load", help="High-rate ingest benchmark")
+    load_parser.add_argument("--endpoint", default=ENDPOINT_URL, help="host:port of the web service")
+    load_parser.add_argument("--sensors", type=int, default=100, help="Simulated sensor count")
+    load_parser.add_argument("--rate", type=float, default=0.0, help="Target events/s (0 = unthrottled)")
+    load_parser.add_argument("--concurrency", type=int, default=8, help="Keep-alive connections")
+    load_parser.add_argument("--batch", type=int, default=1, help="Events per request (>1 uses the batch endpoint)")
+    load_parser.add_argument("--events", type=int, default=None, help="Stop after N events")
+    load_parser.add_argument("--duration", type=float, default=None, help="Stop after N seconds")
+    load_parser.add_argument("--replay", default=None, help="NDJSON file of recorded events to send")
+    load_parser.add_argument("--retime", action="store_true", help="Stamp replayed events with the send time")
+    load_parser.add_argument("--loop", action="store_true", help="Replay the file until stopped")
+    load_parser.add_argument(
+        "--visibility-every",
+        type=int,
+        default=100,
+        help="Probe Typesense read visibility for every Nth request (0 = off)",
+    )
+    load_parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    load_parser.add_argument("--seed", type=int, default=None, help="Seed for synthetic events")
+    load_parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+
+    args = parser.parse_args(argv)
+    if args.command == "load":
+        if args.events is None and args.duration is None and not (args.replay and not args.loop):
+            args.duration = 60.0
+        load(args)
+    else:
+        simulate()
+
+
 if __name__ == "__main__":
     from logs import setup_logging
 
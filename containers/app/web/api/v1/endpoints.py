@@ -1,15 +1,97 @@
-from typing import Any, Dict, List, Optional
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import JSONResponse
 from processor.anomaly_detector import SystemEventTracker
-from processor.database import AnomalySummary, SystemEventsDBHandler
+from processor.database import (
+    AnomalySummary,
+    SystemEventsDBHandler,
+    event_doc_id,
+    int_from_iso,
+    node_health,
+)
+from processor.dedup import IN_FLIGHT, STORED, RecentKeys
+from processor.detectors import load_detectors
+from processor.dropout_monitor import DropoutMonitor
+from processor.metrics import (
+    INGEST_ANOMALIES,
+    INGEST_DUPLICATES,
+    INGEST_EVENTS,
+    INGEST_IN_FLIGHT,
+    INGEST_STAGE_SECONDS,
+)
+from processor.rules import RuleEngine
 from pydantic import BaseModel
 from web.utils import llm_active
 
+logger = logging.getLogger("endpoints.py")
+
 router: APIRouter = APIRouter()
 system_event_store: SystemEventsDBHandler = SystemEventsDBHandler()
 anomaly_summary_store: AnomalySummary = AnomalySummary()
-processor: SystemEventTracker = SystemEventTracker()
+
+
+def store_dropouts(anomalies: List[Dict[str, Any]]) -> List[str]:
+    """
+    Store the monitor's dropouts with one import.
+
+    Returns:
+        The sensor ids whose dropout document was stored.
+    """
+    results: List[Dict[str, Any]] = system_event_store.add_events(
+        [
+            {
+                "timestamp": anomaly["timestamp"],
+                "sensor_id": anomaly["sensor_id"],
+                "anomalies": [anomaly],
+                "is_anomaly": True,
+            }
+            for anomaly in anomalies
+        ]
+    )
+    stored: List[str] = []
+    failed: List[Dict[str, Any]] = []
+    for anomaly, result in zip(anomalies, results):
+        if result.get("success"):
+            stored.append(anomaly["sensor_id"])
+            INGEST_ANOMALIES.inc("dropout")
+        else:
+            failed.append(result)
+    if failed:
+        logger.error(f"Failed to store {len(failed)} of {len(results)} dropouts: {failed[0]}")
+    return stored
+
+
+dropout_monitor: DropoutMonitor = DropoutMonitor(on_dropouts=store_dropouts)
+processor: SystemEventTracker = SystemEventTracker(
+    dropout_monitor=dropout_monitor,
+    detectors=load_detectors(),
+    rules=RuleEngine.from_env(),
+)
+recent_events: RecentKeys = RecentKeys.from_env()
+
+
+def ingest_key(event: Dict[str, Any]) -> Optional[Tuple[str, int]]:
+    """
+    Idempotency key of a reading: its sensor and timestamp in epoch ms, so
+    equivalent ISO spellings of the same instant match.
+    """
+    try:
+        return event["sensor_id"], int_from_iso(event["timestamp"])
+    except ValueError:
+        return None
+
+
+IN_FLIGHT_ERROR: str = "This reading is still being stored; retry later"
+
+
+def count_anomalies(doc: Dict[str, Any]) -> None:
+    for anomaly in doc["anomalies"]:
+        # The end of a dropout the monitor already stored (and counted)
+        if not anomaly.get("resumed"):
+            INGEST_ANOMALIES.inc(anomaly["type"])
 
 
 class SystemEvent(BaseModel):
@@ -43,21 +125,152 @@ def get_latest_summary(
 
 
 @router.get("/status", summary="Get system health status")
-def get_status() -> Dict[str, str]:
+def get_status() -> Dict[str, Any]:
     return {
         "summary_store": (
             "active" if anomaly_summary_store.get_collection() else "down"
         ),
         "anomaly_store": "active" if system_event_store.get_collection() else "down",
         "llm": "active" if llm_active() else "down",
+        "typesense_nodes": {
+            url: "active" if healthy else "down"
+            for url, healthy in node_health().items()
+        },
     }
 
 
 @router.post("/system_event", summary="Receive system event")
-def system_event(event: SystemEvent) -> Any:
+def system_event(event: SystemEvent, request: Request) -> Any:
+    INGEST_IN_FLIGHT.inc()
+    claimed: Optional[Tuple[str, int]] = None
     try:
+        # Body parsing and schema validation happen before the handler runs
+        INGEST_STAGE_SECONDS.observe(
+            time.perf_counter() - request.state.received_at, "validation"
+        )
         event_dict: Dict[str, Any] = event.model_dump()
-        processed: Dict[str, Any] = processor.process_event(event_dict)
-        return system_event_store.add_event({**event_dict, **processed})
+        key: Optional[Tuple[str, int]] = ingest_key(event_dict)
+        state: str = recent_events.claim(key)
+        if state == STORED:
+            INGEST_DUPLICATES.inc("memory")
+            INGEST_EVENTS.inc("duplicate")
+            return {"id": event_doc_id(*key), "duplicate": True}  # type: ignore
+        if state == IN_FLIGHT:
+            # Not a duplicate yet: the first request may still fail to store
+            INGEST_EVENTS.inc("in_flight")
+            return JSONResponse(
+                {"error": IN_FLIGHT_ERROR, "id": event_doc_id(*key)},  # type: ignore
+                status_code=409,
+                headers={"Retry-After": "1"},
+            )
+        claimed = key
+
+        with INGEST_STAGE_SECONDS.time("detection"):
+            doc: Dict[str, Any] = {**event_dict, **processor.process_event(event_dict)}
+        with INGEST_STAGE_SECONDS.time("store"):
+            stored: Any = system_event_store.add_event(doc)
+        recent_events.commit(claimed)
+        claimed = None
+
+        if stored.get("duplicate"):
+            INGEST_DUPLICATES.inc("store")
+            INGEST_EVENTS.inc("duplicate")
+        else:
+            INGEST_EVENTS.inc("stored")
+            count_anomalies(doc)
+        return stored
+    except Exception as exc:
+        recent_events.release(claimed)
+        INGEST_EVENTS.inc("error")
+        return {"error": str(exc)}
+    finally:
+        INGEST_IN_FLIGHT.dec()
+
+
+@router.post("/system_events/batch", summary="Receive a batch of system events")
+def system_events_batch(events: List[SystemEvent], request: Request) -> Any:
+    INGEST_IN_FLIGHT.inc()
+    # Keys owned by this request, one per document sent to the store
+    claimed: List[Optional[Tuple[str, int]]] = []
+    try:
+        INGEST_STAGE_SECONDS.observe(
+            time.perf_counter() - request.state.received_at, "validation"
+        )
+        # One result per input event; None until the store has answered
+        results: List[Optional[Dict[str, Any]]] = []
+        # (result slot, document index, repeat of an earlier event in this batch)
+        links: List[Tuple[int, int, bool]] = []
+        batch_keys: Dict[Tuple[str, int], int] = {}
+        docs: List[Dict[str, Any]] = []
+        busy: bool = False
+        with INGEST_STAGE_SECONDS.time("detection"):
+            for event in events:
+                event_dict: Dict[str, Any] = event.model_dump()
+                key: Optional[Tuple[str, int]] = ingest_key(event_dict)
+                if key is not None and key in batch_keys:
+                    links.append((len(results), batch_keys[key], True))
+                    results.append(None)
+                    continue
+                state: str = recent_events.claim(key)
+                if state == STORED:
+                    INGEST_DUPLICATES.inc("memory")
+                    INGEST_EVENTS.inc("duplicate")
+                    results.append(
+                        {"success": True, "id": event_doc_id(*key), "duplicate": True}  # type: ignore
+                    )
+                    continue
+                if state == IN_FLIGHT:
+                    INGEST_EVENTS.inc("in_flight")
+                    busy = True
+                    results.append(
+                        {
+                            "success": False,
+                            "id": event_doc_id(*key),  # type: ignore
+                            "code": 409,
+                            "error": IN_FLIGHT_ERROR,
+                        }
+                    )
+                    continue
+                if key is not None:
+                    batch_keys[key] = len(docs)
+                links.append((len(results), len(docs), False))
+                results.append(None)
+                docs.append({**event_dict, **processor.process_event(event_dict)})
+                claimed.append(key)
+
+        with INGEST_STAGE_SECONDS.time("store"):
+            stored: List[Dict[str, Any]] = system_event_store.add_events(docs)
+        for key, doc, result in zip(claimed, docs, stored):
+            if result.get("duplicate"):
+                recent_events.commit(key)
+                INGEST_DUPLICATES.inc("store")
+                INGEST_EVENTS.inc("duplicate")
+            elif result.get("success"):
+                recent_events.commit(key)
+                INGEST_EVENTS.inc("stored")
+                count_anomalies(doc)
+            else:
+                recent_events.release(key)
+                INGEST_EVENTS.inc("error")
+        claimed = []
+
+        for slot, index, repeat in links:
+            linked: Dict[str, Any] = stored[index]
+            if repeat:
+                INGEST_DUPLICATES.inc("memory")
+                INGEST_EVENTS.inc("duplicate")
+                if linked.get("success"):
+                    linked = {**linked, "duplicate": True}
+            results[slot] = linked
+        if busy:
+            # Retrying the whole batch is safe: stored readings come back as duplicates
+            return JSONResponse(results, status_code=409, headers={"Retry-After": "1"})
+        return results
     except Exception as exc:
+        for key in claimed:
+            recent_events.release(key)
+        # Only the documents sent on to the store; duplicates were already counted
+        INGEST_EVENTS.inc("error", amount=len(claimed))
         return {"error": str(exc)}
+    finally:
+        INGEST_IN_FLIGHT.dec()
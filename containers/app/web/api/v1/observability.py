@@ -0,0 +1,29 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from processor.metrics import CONTENT_TYPE, REGISTRY
+from processor.profiler import ProfileError, profile_request
+
+router: APIRouter = APIRouter()
+
+
+@router.get("/metrics", summary="Prometheus metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@router.get(
+    "/debug/profile",
+    summary="Sample a CPU profile of this process",
+    response_class=PlainTextResponse,
+)
+def get_profile(
+    seconds: float = Query(10, description="How long to sample (max 120)"),
+    x_profile_token: Optional[str] = Header(None, description="Value of PROFILING_TOKEN"),
+) -> PlainTextResponse:
+    """Return collapsed stacks for flamegraph.pl or speedscope."""
+    try:
+        return PlainTextResponse(profile_request(seconds, x_profile_token))
+    except ProfileError as exc:
+        raise HTTPException(status_code=exc.status, detail=exc.detail)
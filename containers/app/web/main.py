@@ -1,6 +1,38 @@
-from fastapi import FastAPI
-from web.api.v1 import endpoints
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable
 
-app: FastAPI = FastAPI(title="Anomaly Detection API")
+from fastapi import FastAPI, Request, Response
+from processor.metrics import DROPOUT_TIMERS, HTTP_REQUEST_SECONDS, INGEST_DEDUP_KEYS
+from web.api.v1 import endpoints, observability
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    DROPOUT_TIMERS.set_function(lambda: len(endpoints.dropout_monitor.wheel))
+    INGEST_DEDUP_KEYS.set_function(lambda: len(endpoints.recent_events))
+    endpoints.dropout_monitor.start()
+    yield
+    endpoints.dropout_monitor.stop()
+
+
+app: FastAPI = FastAPI(title="Anomaly Detection API", lifespan=lifespan)
 
 app.include_router(endpoints.router, tags=["Endpoints"])
+app.include_router(observability.router, tags=["Observability"])
+
+
+@app.middleware("http")
+async def record_latency(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    # Handlers measure their own stages from this point (see system_event)
+    request.state.received_at = time.perf_counter()
+    response: Response = await call_next(request)
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - request.state.received_at,
+        request.method,
+        getattr(route, "path", "unmatched"),
+    )
+    return response